@@ -1,14 +1,20 @@
 from flask import Blueprint, jsonify, request, Response, current_app
-from datetime import datetime, timezone
 import os
 import logging
 import socket
+from pathlib import Path
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
+from utils.clock import utc_now_iso
+
 logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint("admin", __name__)
 
+# The spec never changes at runtime, so read it once instead of per request
+OPENAPI_PATH = Path(__file__).resolve().parent.parent / "static" / "swagger.json"
+OPENAPI_BODY = OPENAPI_PATH.read_bytes() if OPENAPI_PATH.exists() else b"{}"
+
 
 @admin_bp.route("/api/v1/health", methods=["GET"])
 def health():
@@ -23,7 +29,7 @@ def health():
                 {
                     "status": "healthy",
                     "version": "2.5.0",
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": utc_now_iso(),
                     "environment": os.getenv("FLASK_ENV", "development"),
                     "provider_status": provider_status,
                 }
@@ -62,13 +68,23 @@ def readiness():
                 "status": "ready" if status_ok else "not_ready",
                 "env_valid": env_status.is_valid if env_status else True,
                 "providers": provider_status,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": utc_now_iso(),
             }
         ),
         response_status,
     )
 
 
+@admin_bp.route("/api/v1/openapi.json")
+def openapi_spec():
+    """Serve the precomputed OpenAPI spec"""
+    return Response(
+        OPENAPI_BODY,
+        mimetype="application/json",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
 @admin_bp.route("/metrics")
 def metrics():
     """Prometheus metrics endpoint"""
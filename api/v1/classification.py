@@ -1,16 +1,59 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
+from werkzeug.exceptions import RequestEntityTooLarge
 from pydantic import BaseModel, Field, ValidationError
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+import os
+import re
 import time
+import hashlib
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from extensions import limiter
-from middleware.auth import require_api_key
+import unicodedata
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from extensions import limiter, cache
+import middleware.auth as auth_middleware
+from middleware.auth import require_api_key, redis_prefetch
+from providers.multi_provider import AllProvidersFailedError
+from utils import semantic_cache
+from utils.micro_batcher import MicroBatcher
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 classification_bp = Blueprint("classification", __name__)
 
+# Provider calls are network-bound, so batch fan-out shares one long-lived pool
+# per worker process instead of spawning fresh threads on every request.
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "10"))
+_batch_executor = ThreadPoolExecutor(
+    max_workers=BATCH_MAX_WORKERS, thread_name_prefix="classify-batch"
+)
+
+# Tickets packed into one provider prompt when the classifier supports batching
+BATCH_PROMPT_SIZE = int(os.getenv("BATCH_PROMPT_SIZE", "20"))
+
+# Single classify calls arriving within this window share one batch prompt (0 = off)
+CLASSIFY_BATCH_WINDOW_MS = float(os.getenv("CLASSIFY_BATCH_WINDOW_MS", "0"))
+
+CLASSIFICATION_CACHE_TTL = int(os.getenv("CLASSIFICATION_CACHE_TTL", "3600"))
+
+# Per-process L1 in front of Redis so bursts of repeated tickets skip the network
+CLASSIFICATION_L1_SIZE = int(os.getenv("CLASSIFICATION_L1_SIZE", "10000"))
+CLASSIFICATION_L1_TTL = int(os.getenv("CLASSIFICATION_L1_TTL", "60"))
+_local_cache = TTLCache(maxsize=CLASSIFICATION_L1_SIZE, ttl=CLASSIFICATION_L1_TTL)
+
+# Tickets every provider just failed on are answered from memory for a short
+# while, so client retry loops do not re-run the whole failover chain
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", "60"))
+_failed_tickets = TTLCache(maxsize=1000, ttl=NEGATIVE_CACHE_TTL)
+
+# JSON bodies above this are rejected before any bytes are decoded
+MAX_JSON_BODY_BYTES = int(os.getenv("MAX_JSON_BODY_BYTES", "1000000"))
+
+# Only tag-shaped runs (a letter, "/" or "!" after "<"), so "price < 5 and > 3" survives
+_TAG_RE = re.compile(r"</?[A-Za-z!][^<>]*>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class TicketRequest(BaseModel):
     ticket: str = Field(..., min_length=10, max_length=10000)
@@ -20,35 +63,328 @@ class BatchTicketRequest(BaseModel):
     tickets: List[str] = Field(..., min_length=1, max_length=100)
 
 
+class PayloadValidationError(ValueError):
+    def __init__(self, field: str, msg: str):
+        super().__init__(msg)
+        self.details = [{"loc": [field], "msg": msg}]
+
+
+def _raw_body() -> bytes:
+    """Read the request body, refusing oversized payloads before buffering them"""
+    if "raw_body" not in g:
+        if request.content_length and request.content_length > MAX_JSON_BODY_BYTES:
+            raise RequestEntityTooLarge()
+        # The stream is consumed here; keep the bytes for the prefetch hook and
+        # the view, which both parse the body
+        g.raw_body = request.get_data(cache=False)
+    return g.raw_body
+
+
+def _json_body():
+    """Decode the raw request body once per request, skipping Werkzeug's JSON path"""
+    if "json_body" not in g:
+        try:
+            g.json_body = current_app.json.loads(_raw_body())
+        except ValueError:
+            raise PayloadValidationError("body", "Invalid JSON")
+    return g.json_body
+
+
+def _parse_batch_request(payload) -> BatchTicketRequest:
+    """Check batch bounds by hand and skip validator execution on the hot path."""
+    tickets = payload.get("tickets") if isinstance(payload, dict) else None
+    if not isinstance(tickets, list):
+        raise PayloadValidationError("tickets", "Input should be a valid list")
+    if not 1 <= len(tickets) <= 100:
+        raise PayloadValidationError(
+            "tickets", "List should have between 1 and 100 items"
+        )
+    if not all(isinstance(t, str) for t in tickets):
+        raise PayloadValidationError("tickets", "Input should be a valid string")
+    return BatchTicketRequest.model_construct(tickets=tickets)
+
+
 def sanitize_text(text: str) -> str:
+    # Tickets go to an LLM and a hash, never into HTML, so strip tags but do not escape
     if not text:
         return ""
-    import bleach
-    import re
-
     text = text.replace("\x00", "")
-    text = bleach.clean(text, strip=True)
-    text = re.sub(r"\s+", " ", text)
+    if "<" in text:
+        text = _TAG_RE.sub("", text)
+    text = _WHITESPACE_RE.sub(" ", text)
     return text[:5000].strip()
 
 
+def _cache_key(ticket: str) -> str:
+    """Key on the whole normalized ticket so only equivalent tickets share a hit"""
+    if ticket.isascii():
+        # NFKC and casefold are identities beyond lower() on ASCII; work on bytes
+        normalized = ticket.encode("ascii").strip().lower()
+    else:
+        normalized = unicodedata.normalize("NFKC", ticket).strip().casefold()
+        normalized = normalized.encode("utf-8")
+    digest = hashlib.blake2b(normalized, digest_size=16).hexdigest()
+    return "ticket_classification:" + digest
+
+
+def _cache_get_many(keys: List[str]) -> List[Optional[Dict]]:
+    """Fetch cached classifications in one round trip; a cache outage is a miss."""
+    try:
+        client = auth_middleware.redis_client
+        if not client:
+            return list(cache.get_many(*keys))
+
+        results = [_local_cache.get(k) for k in keys]
+        remote = [k for k, r in zip(keys, results) if r is None]
+        if not remote:
+            return [dict(r) for r in results]
+
+        # Values already fetched alongside the rate-limit check need no round trip
+        prefetched = g.get("redis_prefetch", {})
+        raw = {k: prefetched[k] for k in remote if k in prefetched}
+        missing = [k for k in remote if k not in raw]
+        if missing:
+            raw.update(zip(missing, client.mget(missing)))
+        for i, k in enumerate(keys):
+            if results[i] is not None:
+                results[i] = dict(results[i])
+            elif raw[k]:
+                results[i] = current_app.json.loads(raw[k])
+                _local_cache.set(k, dict(results[i]))
+        return results
+    except Exception as e:
+        logger.warning("Classification cache read failed: %s", e)
+        return [None] * len(keys)
+
+
+def _cache_set_many(mapping: Dict[str, Dict]) -> None:
+    if not mapping:
+        return
+    try:
+        client = auth_middleware.redis_client
+        if not client:
+            cache.set_many(mapping, timeout=CLASSIFICATION_CACHE_TTL)
+            return
+
+        pipe = client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            _local_cache.set(key, dict(value))
+            pipe.set(key, current_app.json.dumps(value), ex=CLASSIFICATION_CACHE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Classification cache write failed: %s", e)
+
+
+_semantic_cache = None
+
+
+def _get_semantic_cache():
+    """Return the semantic cache when enabled and Redis is reachable"""
+    global _semantic_cache
+    client = auth_middleware.redis_client
+    if not semantic_cache.SEMANTIC_CACHE_ENABLED or not client:
+        return None
+    if _semantic_cache is None or _semantic_cache.redis is not client:
+        _semantic_cache = semantic_cache.SemanticCache(client)
+    return _semantic_cache
+
+
+def _semantic_lookup(ticket: str) -> Optional[Dict]:
+    cache_ = _get_semantic_cache()
+    if cache_ is None:
+        return None
+    try:
+        return cache_.lookup(ticket)
+    except ImportError as e:
+        logger.warning("Semantic cache disabled: %s", e)
+        semantic_cache.SEMANTIC_CACHE_ENABLED = False
+    except Exception as e:
+        logger.warning("Semantic cache lookup failed: %s", e)
+    return None
+
+
+def _semantic_store(ticket: str, result: Dict) -> None:
+    cache_ = _get_semantic_cache()
+    if cache_ is None:
+        return
+    try:
+        cache_.store(ticket, result)
+    except Exception as e:
+        logger.warning("Semantic cache write failed: %s", e)
+
+
+_micro_batcher = None
+
+
+def _classify_one(classifier, ticket: str) -> Dict:
+    """Classify a ticket, riding a shared batch prompt when coalescing is on"""
+    global _micro_batcher
+    if CLASSIFY_BATCH_WINDOW_MS <= 0 or not callable(
+        getattr(type(classifier), "classify_batch", None)
+    ):
+        return classifier.classify(ticket)
+
+    batcher = _micro_batcher
+    if batcher is None or batcher.batch_fn != classifier.classify_batch:
+        batcher = _micro_batcher = MicroBatcher(
+            classifier.classify_batch,
+            _batch_executor,
+            max_batch=BATCH_PROMPT_SIZE,
+            window=CLASSIFY_BATCH_WINDOW_MS / 1000,
+        )
+    # Tickets the batch prompt left unanswered fall back to a direct call
+    return batcher.submit(ticket).result() or classifier.classify(ticket)
+
+
+def _classify_miss(classifier, ticket: str, key: str) -> Dict:
+    # Near-duplicate tickets reuse a past classification instead of an LLM call
+    result = _semantic_lookup(ticket)
+    if result is None:
+        result = _classify_one(classifier, ticket)
+        _semantic_store(ticket, result)
+    _cache_set_many({key: result})
+    return result
+
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: str, fn):
+    """Run ``fn`` once per key at a time; concurrent callers share its outcome"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = fn()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def _request_ticket() -> str:
+    """Validate and sanitize the request's ticket once per request"""
+    if "ticket" not in g:
+        # pydantic-core parses and validates the bytes in one pass, no dict
+        try:
+            payload = TicketRequest.model_validate_json(_raw_body())
+        except ValidationError as e:
+            if e.errors()[0]["type"] == "json_invalid":
+                raise PayloadValidationError("body", "Invalid JSON")
+            raise
+        g.ticket = sanitize_text(payload.ticket)
+    return g.ticket
+
+
+def _classify_many(classifier, tickets: List[str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Classify tickets concurrently on the shared pool, preserving input order.
+
+    Cached classifications are resolved with a single multi-get first so only
+    distinct cache misses are dispatched to the providers. Classifiers exposing
+    classify_batch get the misses packed BATCH_PROMPT_SIZE per call; anything
+    a batch call leaves unanswered is retried one ticket at a time.
+    """
+    keys = [_cache_key(t) for t in tickets]
+    results = _cache_get_many(keys)
+    errors = {}
+
+    def task(i, t):
+        try:
+            results[i] = classifier.classify(t)
+        except Exception as e:
+            errors[i] = {"index": i, "error": str(e)}
+
+    def batch_task(idxs):
+        try:
+            answers = classifier.classify_batch([tickets[i] for i in idxs])
+        except Exception as e:
+            logger.warning("Batch prompt failed: %s", e)
+            return
+        for i, answer in zip(idxs, answers):
+            results[i] = answer
+
+    # Repeated tickets in one request are classified once and fanned back out
+    first_index = {}
+    misses = []
+    for i, r in enumerate(results):
+        if r is None and first_index.setdefault(keys[i], i) == i:
+            misses.append(i)
+
+    if len(misses) > 1 and callable(getattr(type(classifier), "classify_batch", None)):
+        chunks = [
+            misses[n : n + BATCH_PROMPT_SIZE]
+            for n in range(0, len(misses), BATCH_PROMPT_SIZE)
+        ]
+        for f in [_batch_executor.submit(batch_task, c) for c in chunks]:
+            f.result()
+
+    pending = [i for i in misses if results[i] is None]
+    futures = [_batch_executor.submit(task, i, tickets[i]) for i in pending]
+    for f in futures:
+        f.result()
+
+    for i, key in enumerate(keys):
+        if results[i] is None and first_index.get(key, i) != i:
+            results[i] = results[first_index[key]]
+            if first_index[key] in errors:
+                errors[i] = {**errors[first_index[key]], "index": i}
+
+    _cache_set_many({keys[i]: results[i] for i in misses if results[i]})
+
+    return [r for r in results if r], [errors[i] for i in sorted(errors)]
+
+
 @classification_bp.route("/classify", methods=["POST"])
 @require_api_key
 @limiter.limit("60 per minute")
+@redis_prefetch(lambda: [_cache_key(_request_ticket())])
 def classify():
     classifier = current_app.config.get("CLASSIFIER")
     if not classifier:
         return jsonify({"error": "Service unavailable"}), 503
 
     try:
-        data = TicketRequest(**request.json)
-        ticket = sanitize_text(data.ticket)
-        result = classifier.classify(ticket)
+        ticket = _request_ticket()
+        key = _cache_key(ticket)
+        # A hit fetched with the rate-limit check is already the response body
+        cached_body = g.get("redis_prefetch", {}).get(key)
+        if cached_body:
+            return current_app.response_class(cached_body, mimetype="application/json")
+        result = _cache_get_many([key])[0]
+        if result is None:
+            failure = _failed_tickets.get(key)
+            if failure is not None:
+                return jsonify({"error": "Internal error", "message": failure}), 500
+            try:
+                result = _single_flight(
+                    key, lambda: _classify_miss(classifier, ticket, key)
+                )
+            except AllProvidersFailedError as e:
+                # Only a failed provider chain says something about the ticket;
+                # transient local errors must not be replayed for the TTL
+                _failed_tickets.set(key, str(e))
+                raise
         return jsonify(result), 200
     except ValidationError as e:
         return jsonify({"error": "Validation error", "details": e.errors()}), 400
+    except PayloadValidationError as e:
+        return jsonify({"error": "Validation error", "details": e.details}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Payload too large"}), 413
     except Exception as e:
-        logger.error(f"Classification error: {e}")
+        logger.error("Classification error: %s", e)
         return jsonify({"error": "Internal error", "message": str(e)}), 500
 
 
@@ -61,35 +397,25 @@ def batch_classify():
         return jsonify({"error": "Service unavailable"}), 503
 
     try:
-        data = BatchTicketRequest(**request.json)
+        data = _parse_batch_request(_json_body())
         tickets = [sanitize_text(t) for t in data.tickets if t]
-
-        results = [None] * len(tickets)
-        errors = []
-        # Parallel processing
-        with ThreadPoolExecutor(max_workers=min(len(tickets), 10)) as executor:
-
-            def task(i, t):
-                try:
-                    results[i] = classifier.classify(t)
-                except Exception as e:
-                    errors.append({"index": i, "error": str(e)})
-
-            futures = [executor.submit(task, i, t) for i, t in enumerate(tickets)]
-            for f in futures:
-                f.result()
+        results, errors = _classify_many(classifier, tickets)
 
         return (
             jsonify(
                 {
                     "total": len(tickets),
-                    "successful": len([r for r in results if r]),
-                    "results": [r for r in results if r],
+                    "successful": len(results),
+                    "results": results,
                     "errors": errors,
                 }
             ),
             200,
         )
+    except PayloadValidationError as e:
+        return jsonify({"error": "Validation error", "details": e.details}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Payload too large"}), 413
     except Exception as e:
         return jsonify({"error": "Batch error", "message": str(e)}), 500
 
@@ -118,29 +444,15 @@ def batch_csv():
             return jsonify({"error": "CSV must contain a 'ticket' column"}), 400
 
         tickets = [sanitize_text(str(t)) for t in df["ticket"].tolist() if pd.notna(t)]
-
-        results = [None] * len(tickets)
-        errors = []
-
-        with ThreadPoolExecutor(max_workers=min(len(tickets), 10)) as executor:
-
-            def task(i, t):
-                try:
-                    results[i] = classifier.classify(t)
-                except Exception as e:
-                    errors.append({"index": i, "error": str(e)})
-
-            futures = [executor.submit(task, i, t) for i, t in enumerate(tickets)]
-            for f in futures:
-                f.result()
+        results, errors = _classify_many(classifier, tickets)
 
         return (
             jsonify(
                 {
                     "total": len(tickets),
-                    "successful": len([r for r in results if r]),
+                    "successful": len(results),
                     "failed": len(errors),
-                    "results": [r for r in results if r],
+                    "results": results,
                     "errors": errors,
                 }
             ),
@@ -148,5 +460,5 @@ def batch_csv():
         )
 
     except Exception as e:
-        logger.error(f"CSV Batch error: {e}")
+        logger.error("CSV Batch error: %s", e)
         return jsonify({"error": "Batch processing failed", "message": str(e)}), 400
@@ -1,4 +1,6 @@
+import itertools
 import os
+import secrets
 import sys
 import time
 from flask import Flask, g, request
@@ -9,6 +11,8 @@ from extensions import db, limiter, cache
 from config.settings import get_settings
 from config.env_validation import validate_environment
 from config.logging_config import setup_logging, logger as structured_logger
+from utils.json_provider import OrjsonProvider
+from middleware.fast_path import FastPathMiddleware, LIVENESS_BODY
 
 # Blueprints
 from routes.main import main_bp
@@ -17,6 +21,49 @@ from admin.admin import admin_bp
 from api.analytics import analytics_bp
 from api.v1.classification import classification_bp
 
+# Request ids only correlate logs, so a per-process random prefix plus a counter
+# is unique enough without an urandom read on every request.
+_request_id_prefix = secrets.token_hex(4)
+_request_counter = itertools.count(1)
+
+
+def _reset_request_ids():
+    global _request_id_prefix, _request_counter
+    _request_id_prefix = secrets.token_hex(4)
+    _request_counter = itertools.count(1)
+
+
+# Gunicorn preloads the app, so each forked worker needs its own prefix
+os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+def next_request_id() -> str:
+    return f"req_{_request_id_prefix}{next(_request_counter):x}"
+
+
+def rate_limit_storage_config() -> dict:
+    """Flask-Limiter storage settings; counters stay in-process unless shared"""
+    redis_url = os.getenv("REDIS_URL")
+    storage = os.getenv("RATELIMIT_STORAGE", "auto")
+    if storage == "auto":
+        # A lone worker enforces limits exactly with a local lock; only
+        # several workers need Redis. gunicorn.conf.py exports its real
+        # worker count, so anything else counts as a single process.
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+        storage = "redis" if workers > 1 else "memory"
+    if not redis_url or storage != "redis":
+        return {"RATELIMIT_STORAGE_URI": "memory://"}
+
+    from config.redis_config import get_redis_pool
+
+    # limits' fixed-window incr is one EVALSHA and rate limit headers stay
+    # off, so each Redis-backed limit costs a single round trip
+    return {
+        "RATELIMIT_STORAGE_URI": redis_url,
+        "RATELIMIT_STORAGE_OPTIONS": {"connection_pool": get_redis_pool()},
+        "RATELIMIT_SWALLOW_ERRORS": True,
+    }
+
 
 def create_app(test_config=None):
     """Application Factory Pattern"""
@@ -25,6 +72,7 @@ def create_app(test_config=None):
     logger = structured_logger.bind(component="app_factory")
 
     app = Flask(__name__, static_folder="static", template_folder="templates")
+    app.json = OrjsonProvider(app)
 
     # Settings & Validation
     settings = get_settings()
@@ -41,16 +89,19 @@ def create_app(test_config=None):
     # Initialize Extensions
     db.init_app(app)
 
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    app.config.update(rate_limit_storage_config())
     limiter.init_app(app)
 
-    cache.init_app(
-        app,
-        config={
-            "CACHE_TYPE": "RedisCache" if os.getenv("REDIS_URL") else "SimpleCache",
-            "CACHE_REDIS_URL": redis_url,
-        },
-    )
+    cache_config = {"CACHE_TYPE": "SimpleCache"}
+    if os.getenv("REDIS_URL"):
+        from config.redis_config import get_redis_cache_client
+
+        # Reuse the bounded, fail-fast pool instead of an ad-hoc per-cache one
+        cache_config = {
+            "CACHE_TYPE": "RedisCache",
+            "CACHE_REDIS_HOST": get_redis_cache_client(),
+        }
+    cache.init_app(app, config=cache_config)
 
     # CORS
     CORS(app, origins=settings.cors_origins_list(), supports_credentials=True)
@@ -76,22 +127,28 @@ def create_app(test_config=None):
     # Swagger UI
     try:
         from flask_swagger_ui import get_swaggerui_blueprint
+
         swaggerui_blueprint = get_swaggerui_blueprint(
-            '/docs',
-            '/static/swagger.json',
-            config={'app_name': "TicketAI API"}
+            "/docs", "/api/v1/openapi.json", config={"app_name": "TicketAI API"}
         )
         app.register_blueprint(swaggerui_blueprint)
         logger.info("✅ Swagger UI initialized at /docs")
     except ImportError:
-        logger.warning("⚠️ flask_swagger_ui not installed. /docs will not be available.")
+        logger.warning(
+            "⚠️ flask_swagger_ui not installed. /docs will not be available."
+        )
 
-    # Request Tracing
-    from uuid import uuid4
+    # Liveness probes skip the Flask request stack entirely. The spec stays
+    # on its Flask route (already precomputed bytes) so it keeps CORS headers.
+    app.wsgi_app = FastPathMiddleware(
+        app.wsgi_app,
+        {"/healthz": (LIVENESS_BODY, [("Cache-Control", "no-store")])},
+    )
 
+    # Request Tracing
     @app.before_request
     def before_request():
-        g.request_id = request.headers.get("X-Request-ID") or f"req_{uuid4().hex}"
-        request.start_time = time.time()
+        g.request_id = request.headers.get("X-Request-ID") or next_request_id()
+        g.start_time = time.monotonic_ns()
 
     return app
@@ -1,5 +1,9 @@
 import structlog
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 
 
@@ -24,16 +28,92 @@ def setup_logging():
         cache_logger_on_first_use=True,
     )
 
-    import os
-
     env = os.getenv("ENV", "development")
     log_level = logging.DEBUG if env == "development" else logging.INFO
 
+    # Request threads only enqueue; a listener thread does the blocking stdout writes
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
+        handlers=[queue_handler],
         level=log_level,
     )
+    if queue_handler in logging.getLogger().handlers:
+        _start_listener(queue_handler)
+
+
+_listener = None
+
+
+def _file_handler(path):
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024))),
+        backupCount=int(os.getenv("LOG_FILE_BACKUPS", "5")),
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _start_listener(queue_handler):
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    handlers = [stream_handler]
+
+    # Optional file output; rotation checks run on the listener thread only
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(_file_handler(log_file))
+
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _restart_listener_after_fork():
+    """Listener threads do not survive fork, so forked workers start their own"""
+    global _listener
+    # Processes rotating one shared file race on rollover, so each worker
+    # writes app.worker<N>.log, N being the slot gunicorn.conf.py's pre_fork
+    # hands out. Respawned workers reuse a slot, so the file set stays bounded;
+    # forks without a slot leave the file to the parent and log to stdout only.
+    # Popped so this worker's own forks (e.g. multiprocessing) get no slot.
+    worker_index = os.environ.pop("LOG_WORKER_INDEX", None)
+    if _listener is None:
+        return
+    handlers = []
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            if worker_index is None:
+                continue
+            root, ext = os.path.splitext(os.getenv("LOG_FILE") or handler.baseFilename)
+            handler = _file_handler(f"{root}.worker{worker_index}{ext}")
+        handlers.append(handler)
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(
+                handler.queue, *handlers, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(_listener.stop)
+
+
+def _forget_worker_index():
+    # The slot belongs to the child just forked; the master's later forks
+    # get theirs from pre_fork again
+    os.environ.pop("LOG_WORKER_INDEX", None)
+
+
+os.register_at_fork(
+    after_in_child=_restart_listener_after_fork,
+    after_in_parent=_forget_worker_index,
+)
 
 
 logger = structlog.get_logger()
@@ -1,25 +1,34 @@
 import os
 import redis
-from redis import ConnectionPool
+from redis import BlockingConnectionPool
 
-_redis_pool = None
+_redis_pools = {}
 _redis_client = None
+_redis_cache_client = None
 
 
-def get_redis_pool():
-    """Get or create Redis connection pool (singleton)"""
-    global _redis_pool
-    if _redis_pool is None:
+def _pool_options() -> dict:
+    """Shared pool settings: bounded, blocking briefly, and failing fast on outages"""
+    return dict(
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "20")),
+        timeout=float(os.getenv("REDIS_POOL_TIMEOUT", "0.1")),
+        socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "1")),
+        socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25")),
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+
+
+def get_redis_pool(decode_responses: bool = True):
+    """Get or create Redis connection pool (singleton per decoding mode)"""
+    pool = _redis_pools.get(decode_responses)
+    if pool is None:
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        _redis_pool = ConnectionPool.from_url(
-            redis_url,
-            max_connections=20,
-            socket_connect_timeout=5,
-            socket_keepalive=True,
-            health_check_interval=30,
-            decode_responses=True,
+        pool = BlockingConnectionPool.from_url(
+            redis_url, decode_responses=decode_responses, **_pool_options()
         )
-    return _redis_pool
+        _redis_pools[decode_responses] = pool
+    return pool
 
 
 def get_redis_client():
@@ -28,3 +37,13 @@ def get_redis_client():
     if _redis_client is None:
         _redis_client = redis.Redis(connection_pool=get_redis_pool())
     return _redis_client
+
+
+def get_redis_cache_client():
+    """Get a byte-level Redis client for Flask-Caching, which pickles values"""
+    global _redis_cache_client
+    if _redis_cache_client is None:
+        _redis_cache_client = redis.Redis(
+            connection_pool=get_redis_pool(decode_responses=False)
+        )
+    return _redis_cache_client
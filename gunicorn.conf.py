@@ -7,9 +7,14 @@ import os
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 
 # Worker configuration
-# Limit workers to prevent memory exhaustion on free tier
-workers = 2  # Fixed number of workers for stability
-threads = 4  # Threads per worker for concurrency
+# Limit workers to prevent memory exhaustion on free tier; override per host
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# The preloaded app picks its rate limit storage from this (see app_factory)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# Requests mostly wait on LLM APIs, so more threads add concurrency cheaply.
+# gthread (not gevent) because the gRPC-based Gemini client is not
+# monkey-patch safe.
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
 worker_class = "gthread"  # Threaded worker for I/O bound tasks
 
 # Timeouts
@@ -26,3 +31,12 @@ proc_name = "ai-ticket-classifier"
 
 # Preload application for memory efficiency
 preload_app = True
+
+
+def pre_fork(server, worker):
+    """Give each worker the lowest free slot for its per-worker log file"""
+    # Runs in the master; the child inherits the env var through fork, and
+    # config.logging_config's at-fork hooks clear it on both sides
+    taken = {getattr(w, "log_index", None) for w in server.WORKERS.values()}
+    worker.log_index = next(i for i in range(len(taken) + 1) if i not in taken)
+    os.environ["LOG_WORKER_INDEX"] = str(worker.log_index)
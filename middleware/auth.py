@@ -4,17 +4,22 @@ Handles API key validation, rate limiting per key, and usage tracking
 """
 
 from functools import wraps
-from flask import request, jsonify, g
+from flask import Response, request, jsonify, g
 import redis
+import json
 import os
 import hashlib
+import hmac
+import math
 import secrets
+import time
 from datetime import datetime, timezone
 import logging
 from sqlalchemy.orm import Session
 
 from config.settings import get_settings
 from database.models import SessionLocal, APIKey, User
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,13 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 REDIS_URL = settings.REDIS_URL
 ALLOW_PROVIDERLESS = os.getenv("ALLOW_PROVIDERLESS", "false").lower() == "true"
+MASTER_API_KEY = os.getenv("MASTER_API_KEY")
+
+# Per-process key_hash -> key data cache so hot keys skip Redis/DB lookups.
+# Revocations are broadcast on API_KEY_REVOKED_CHANNEL so every worker evicts.
+API_KEY_CACHE_TTL = int(os.getenv("API_KEY_CACHE_TTL", "60"))
+API_KEY_REVOKED_CHANNEL = "api_key:revoked"
+_key_cache = TTLCache(maxsize=10_000, ttl=API_KEY_CACHE_TTL)
 
 try:
     from config.redis_config import get_redis_client
@@ -63,8 +75,9 @@ class APIKeyManager:
     def get_key_data(key: str) -> dict:
         """Get API key data from Redis or DB"""
         # Check for Master API Key first
-        master_key = os.getenv("MASTER_API_KEY")
-        if master_key and key == master_key:
+        if MASTER_API_KEY and hmac.compare_digest(
+            key.encode(), MASTER_API_KEY.encode()
+        ):
             return {
                 "id": "master",
                 "key_hash": "master",
@@ -76,6 +89,22 @@ class APIKeyManager:
 
         key_hash = APIKeyManager.hash_key(key)
 
+        # Without the revocation listener another worker's revoke would go
+        # unnoticed here, so only use the cache while it is running
+        listening = redis_client is not None and _ensure_invalidation_listener()
+        if listening:
+            cached = _key_cache.get(key_hash)
+            if cached is not None:
+                return dict(cached)
+
+        data = APIKeyManager._load_key_data(key_hash)
+        if data and listening:
+            _key_cache.set(key_hash, dict(data))
+        return data
+
+    @staticmethod
+    def _load_key_data(key_hash: str) -> dict:
+        """Look up API key data in Redis, falling back to the database"""
         # 1. Try Redis
         if redis_client:
             cached_data = redis_client.hgetall(f"api_key:{key_hash}")
@@ -163,6 +192,7 @@ class APIKeyManager:
                     "name": name,
                 }
                 redis_client.hset(f"api_key:{key_hash}", mapping=redis_data)
+                redis_client.expire(f"api_key:{key_hash}", 300)  # Cache for 5 mins
                 redis_client.sadd(f"user_keys:{user_id}", key_hash)
 
             return key_data
@@ -186,10 +216,13 @@ class APIKeyManager:
             if key:
                 key.is_active = False
                 db.commit()
+                _key_cache.pop(key.key_hash)
 
                 # Update Redis
                 if redis_client:
                     redis_client.hset(f"api_key:{key.key_hash}", "is_active", "false")
+                    redis_client.expire(f"api_key:{key.key_hash}", 300)
+                    redis_client.publish(API_KEY_REVOKED_CHANNEL, key.key_hash)
 
                 return True
             return False
@@ -221,6 +254,172 @@ class APIKeyManager:
             db.close()
 
 
+# GCRA over the hourly and daily limits in one atomic round trip. Each key holds
+# the theoretical arrival time (TAT) in ms; both limits are checked before either
+# is advanced. KEYS: hour key, day key. ARGV: now_ms, hour limit, day limit (-1 = none).
+# Returns {allowed, limited_window (0 none, 1 hour, 2 day), hour_remaining,
+#          day_remaining, reset_ms}
+RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+
+local function gcra(key, limit, period)
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - period
+    if allow_at > now then
+        return false, 0, allow_at - now, new_tat
+    end
+    return true, math.floor((now - allow_at) / interval), 0, new_tat
+end
+
+local hour_ok, hour_remaining, hour_reset, hour_tat =
+    gcra(KEYS[1], tonumber(ARGV[2]), 3600000)
+if not hour_ok then
+    return {0, 1, 0, 0, hour_reset}
+end
+
+local day_limit = tonumber(ARGV[3])
+local day_remaining = -1
+if day_limit >= 0 then
+    local day_ok, remaining, day_reset, day_tat = gcra(KEYS[2], day_limit, 86400000)
+    if not day_ok then
+        return {0, 2, hour_remaining, 0, day_reset}
+    end
+    day_remaining = remaining
+    redis.call('SET', KEYS[2], tostring(day_tat), 'PX', math.ceil(day_tat - now))
+end
+
+redis.call('SET', KEYS[1], tostring(hour_tat), 'PX', math.ceil(hour_tat - now))
+return {1, 0, hour_remaining, day_remaining, 0}
+"""
+
+RATE_LIMIT_RESET_CHANNEL = "rate_limit:reset"
+
+
+def _rate_limit_keys(user_id: str) -> list:
+    # The {user_id} hash tag keeps both windows in one Redis Cluster slot,
+    # which the script needs since it touches both keys atomically
+    return [f"rate_limit:gcra:{{{user_id}}}:hour", f"rate_limit:gcra:{{{user_id}}}:day"]
+
+
+# Local deny cache: user_id -> (monotonic deadline, limit). While a client is
+# known to be over its limit, denials are answered without touching Redis.
+_blocked_until = {}
+_BLOCKED_MAX_ENTRIES = 10_000
+_invalidation_listener = None
+_invalidation_listener_pid = None
+_invalidation_retry_at = 0.0
+_INVALIDATION_RETRY_SECONDS = 5
+
+
+def _on_rate_limit_reset(message):
+    _blocked_until.pop(message.get("data"), None)
+
+
+def _on_api_key_revoked(message):
+    _key_cache.pop(message.get("data"))
+
+
+def _on_invalidation_listener_error(error, pubsub, thread):
+    # Messages sent while the subscription is down are lost, so nothing
+    # cached so far can be trusted; the next lookup resubscribes
+    logger.warning("Cache invalidation listener lost: %s", error)
+    _key_cache.clear()
+    thread.stop()
+
+
+def _ensure_invalidation_listener() -> bool:
+    """Keep one live subscription per process to cross-process resets and revocations"""
+    global _invalidation_listener, _invalidation_listener_pid, _invalidation_retry_at
+    if _invalidation_listener_pid != os.getpid():
+        _invalidation_listener_pid = os.getpid()
+        _invalidation_listener = None
+        _invalidation_retry_at = 0.0
+    if _invalidation_listener is not None:
+        if _invalidation_listener.is_alive():
+            return True
+        _key_cache.clear()
+        _invalidation_listener = None
+
+    # While Redis is unreachable, retry now and then rather than per request
+    now = time.monotonic()
+    if now < _invalidation_retry_at:
+        return False
+    _invalidation_retry_at = now + _INVALIDATION_RETRY_SECONDS
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(
+            **{
+                RATE_LIMIT_RESET_CHANNEL: _on_rate_limit_reset,
+                API_KEY_REVOKED_CHANNEL: _on_api_key_revoked,
+            }
+        )
+        _invalidation_listener = pubsub.run_in_thread(
+            sleep_time=1,
+            daemon=True,
+            exception_handler=_on_invalidation_listener_error,
+        )
+    except Exception as e:
+        logger.warning("Cache invalidation listener unavailable: %s", e)
+    return _invalidation_listener is not None
+
+
+def _block_locally(user_id: str, reset_ms: int, limit: int) -> None:
+    if len(_blocked_until) >= _BLOCKED_MAX_ENTRIES:
+        now = time.monotonic()
+        for key in [k for k, (until, _) in _blocked_until.items() if until <= now]:
+            _blocked_until.pop(key, None)
+        if len(_blocked_until) >= _BLOCKED_MAX_ENTRIES:
+            return
+    _blocked_until[user_id] = (time.monotonic() + reset_ms / 1000, limit)
+    _ensure_invalidation_listener()
+
+
+_rate_limit_script = None
+
+
+def _get_rate_limit_script():
+    """Return the rate limit script registered on the current Redis client"""
+    global _rate_limit_script
+    if (
+        _rate_limit_script is None
+        or _rate_limit_script.registered_client is not redis_client
+    ):
+        _rate_limit_script = redis_client.register_script(RATE_LIMIT_LUA)
+    return _rate_limit_script
+
+
+# Pipelines queue EVALSHA with this directly: a Script object queued on a
+# pipeline makes redis-py send SCRIPT EXISTS before every batch
+_rate_limit_sha = hashlib.sha1(RATE_LIMIT_LUA.encode()).hexdigest()
+
+# Preload so the first rate-limited request is already a single EVALSHA
+if redis_client:
+    try:
+        _rate_limit_sha = redis_client.script_load(RATE_LIMIT_LUA)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to preload rate limit script: {e}")
+
+
+def _rate_limit_and_mget(script_keys: list, args: list, keys: list) -> list:
+    """Run the rate limit script and MGET ``keys`` in one pipelined round trip"""
+    for attempt in range(2):
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.evalsha(_rate_limit_sha, len(script_keys), *script_keys, *args)
+        pipe.mget(keys)
+        try:
+            return pipe.execute()
+        except redis.exceptions.NoScriptError:
+            # Script cache flushed or a failover since the preload
+            if attempt:
+                raise
+            redis_client.script_load(RATE_LIMIT_LUA)
+
+
 class RateLimiter:
     """Rate limiting per API key"""
 
@@ -230,77 +429,148 @@ class RateLimiter:
         if not redis_client:
             return True, {}
 
+        allowed, rate_info, _ = RateLimiter.check_rate_limit_and_get(user_id, tier, [])
+        return allowed, rate_info
+
+    @staticmethod
+    def check_rate_limit_and_get(user_id: str, tier: str, keys: list) -> tuple:
+        """Check rate limits and GET ``keys`` in the same Redis round trip"""
+        if not redis_client:
+            return True, {}, [None] * len(keys)
+
+        blocked = _blocked_until.get(user_id)
+        if blocked:
+            remaining_s = blocked[0] - time.monotonic()
+            if remaining_s > 0:
+                return (
+                    False,
+                    {
+                        "limit": blocked[1],
+                        "remaining": 0,
+                        "reset_in": max(1, math.ceil(remaining_s)),
+                    },
+                    [None] * len(keys),
+                )
+            _blocked_until.pop(user_id, None)
+
         limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
 
         if limits["requests_per_hour"] == -1:
-            return True, {"remaining": "unlimited"}
+            values = redis_client.mget(keys) if keys else []
+            return True, {"remaining": "unlimited"}, values
+
+        script_kwargs = dict(
+            keys=_rate_limit_keys(user_id),
+            args=[
+                int(time.time() * 1000),
+                limits["requests_per_hour"],
+                limits["requests_per_day"],
+            ],
+        )
+        if keys:
+            result, values = _rate_limit_and_mget(
+                script_kwargs["keys"], script_kwargs["args"], keys
+            )
+        else:
+            result, values = _get_rate_limit_script()(**script_kwargs), []
 
-        hour_key = f"rate_limit:hour:{user_id}"
-        hour_count = redis_client.incr(hour_key)
+        allowed, limited, hour_remaining, day_remaining, reset_ms = result
+        if not allowed:
+            limit_key = "requests_per_hour" if limited == 1 else "requests_per_day"
+            _block_locally(user_id, int(reset_ms), limits[limit_key])
+            return (
+                False,
+                {
+                    "limit": limits[limit_key],
+                    "remaining": 0,
+                    "reset_in": max(1, math.ceil(int(reset_ms) / 1000)),
+                },
+                values,
+            )
 
-        if hour_count == 1:
-            redis_client.expire(hour_key, 3600)
+        return (
+            True,
+            {
+                "hourly_limit": limits["requests_per_hour"],
+                "hourly_remaining": hour_remaining,
+                "daily_limit": limits["requests_per_day"],
+                "daily_remaining": day_remaining,
+            },
+            values,
+        )
 
-        if hour_count > limits["requests_per_hour"]:
-            return False, {
-                "limit": limits["requests_per_hour"],
-                "remaining": 0,
-                "reset_in": redis_client.ttl(hour_key),
-            }
+    @staticmethod
+    def reset(user_id: str) -> None:
+        """Clear a user's limits everywhere, including other processes' deny caches"""
+        _blocked_until.pop(user_id, None)
+        if not redis_client:
+            return
+        redis_client.delete(*_rate_limit_keys(user_id))
+        redis_client.publish(RATE_LIMIT_RESET_CHANNEL, user_id)
 
-        # Check daily limit
-        if limits["requests_per_day"] != -1:
-            day_key = f"rate_limit:day:{user_id}"
-            day_count = redis_client.incr(day_key)
 
-            if day_count == 1:
-                redis_client.expire(day_key, 86400)
+# 401 bodies are fixed, so serialize them once instead of per rejected request
+_AUTH_ERROR_BODIES = {
+    reason: json.dumps({"error": reason}).encode()
+    for reason in ("API key required", "Invalid API key", "API key revoked")
+}
 
-            if day_count > limits["requests_per_day"]:
-                return False, {
-                    "limit": limits["requests_per_day"],
-                    "remaining": 0,
-                    "reset_in": redis_client.ttl(day_key),
-                }
 
-        return True, {
-            "hourly_limit": limits["requests_per_hour"],
-            "hourly_remaining": limits["requests_per_hour"] - hour_count,
-            "daily_limit": limits["requests_per_day"],
-            "daily_remaining": max(
-                0,
-                (
-                    limits["requests_per_day"]
-                    - (redis_client.get(f"rate_limit:day:{user_id}") or 0)
-                    if limits["requests_per_day"] != -1
-                    else -1
-                ),
-            ),
-        }
+def _auth_error(reason: str) -> Response:
+    return Response(_AUTH_ERROR_BODIES[reason], 401, mimetype="application/json")
+
+
+def redis_prefetch(keys_func):
+    """Mark a view whose Redis ``keys_func()`` reads ride the rate-limit round trip
+
+    Apply below ``require_api_key``; fetched values land in ``g.redis_prefetch``.
+    """
+
+    def decorator(f):
+        f.redis_prefetch = keys_func
+        return f
+
+    return decorator
 
 
 def require_api_key(f):
     """Decorator to require API key authentication"""
 
+    # Resolved once at decoration time rather than on every request
+    keys_func = getattr(f, "redis_prefetch", None)
+
     @wraps(f)
     def decorated_function(*args, **kwargs):
         api_key = request.headers.get("X-API-Key")
 
         if not api_key:
-            return jsonify({"error": "API key required"}), 401
+            return _auth_error("API key required")
 
         key_data = APIKeyManager.get_key_data(api_key)
 
         if not key_data:
-            return jsonify({"error": "Invalid API key"}), 401
+            return _auth_error("Invalid API key")
 
         if not key_data.get("is_active"):
-            return jsonify({"error": "API key revoked"}), 401
+            return _auth_error("API key revoked")
 
         user_id = key_data.get("user_id")
         tier = key_data.get("tier", "free")
 
-        allowed, rate_info = RateLimiter.check_rate_limit(user_id, tier)
+        prefetch_keys = []
+        if keys_func and redis_client:
+            try:
+                prefetch_keys = keys_func()
+            except Exception as e:
+                logger.debug("Skipping Redis prefetch: %s", e)
+
+        if prefetch_keys:
+            allowed, rate_info, values = RateLimiter.check_rate_limit_and_get(
+                user_id, tier, prefetch_keys
+            )
+            g.redis_prefetch = dict(zip(prefetch_keys, values))
+        else:
+            allowed, rate_info = RateLimiter.check_rate_limit(user_id, tier)
 
         if not allowed:
             return (
@@ -335,11 +605,14 @@ def require_api_key(f):
 def optional_api_key(f):
     """Decorator for optional API key"""
 
+    # Build the authenticated wrapper once instead of per keyed request
+    authenticated = require_api_key(f)
+
     @wraps(f)
     def decorated_function(*args, **kwargs):
         api_key = request.headers.get("X-API-Key")
         if api_key:
-            return require_api_key(f)(*args, **kwargs)
+            return authenticated(*args, **kwargs)
 
         # Anonymous fallback
         g.user_id = f"anon:{request.remote_addr}"
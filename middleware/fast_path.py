@@ -0,0 +1,35 @@
+"""
+WSGI fast path for static probe responses
+Answers selected GET paths with precomputed bytes before Flask's request stack
+"""
+
+from typing import Dict, List, Tuple
+
+LIVENESS_BODY = b'{"status":"ok"}'
+
+
+class FastPathMiddleware:
+    """Serve fixed responses for hot static paths without entering Flask"""
+
+    def __init__(self, wsgi_app, routes: Dict[str, Tuple[bytes, List[tuple]]]):
+        self.wsgi_app = wsgi_app
+        self.routes = {
+            path: (
+                [body],
+                [
+                    ("Content-Type", "application/json"),
+                    ("Content-Length", str(len(body))),
+                    *headers,
+                ],
+            )
+            for path, (body, headers) in routes.items()
+        }
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") in ("GET", "HEAD"):
+            route = self.routes.get(environ.get("PATH_INFO"))
+            if route is not None:
+                body, headers = route
+                start_response("200 OK", headers)
+                return [] if environ["REQUEST_METHOD"] == "HEAD" else body
+        return self.wsgi_app(environ, start_response)
@@ -1,17 +1,41 @@
 import google.generativeai as genai
+import json
 import os
+import re
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
     retry_if_exception_type,
 )
 import logging
 from google.api_core import exceptions as google_exceptions
-from utils.prompt_formatter import format_classification_prompt
+from utils.prompt_formatter import (
+    format_classification_prompt,
+    format_batch_classification_prompt,
+    parse_batch_classification_response,
+)
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads  # raises a json.JSONDecodeError subclass
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Replies are sometimes wrapped in a markdown code block
+JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Bound to the model once; per-call configs only carry what differs
+GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 100,
+}
+
 
 class RateLimitError(Exception):
     def __init__(self, provider: str, retry_after: int = 60):
@@ -30,19 +54,25 @@ class GeminiClassifier:
 
         # Use Gemini 2.0 Flash (Stable) for best performance and reliability
         try:
-            self.model = genai.GenerativeModel("gemini-2.0-flash")
+            self.model = genai.GenerativeModel(
+                "gemini-2.0-flash", generation_config=GENERATION_CONFIG
+            )
             logger.info("Using gemini-2.0-flash")
         except:
             try:
-                self.model = genai.GenerativeModel("gemini-flash-latest")
+                self.model = genai.GenerativeModel(
+                    "gemini-flash-latest", generation_config=GENERATION_CONFIG
+                )
                 logger.info("Using gemini-flash-latest")
             except:
-                self.model = genai.GenerativeModel("gemini-pro-latest")
+                self.model = genai.GenerativeModel(
+                    "gemini-pro-latest", generation_config=GENERATION_CONFIG
+                )
                 logger.info("Using gemini-pro-latest")
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
+        wait=wait_random_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((Exception,)),
     )
     def classify(self, ticket_text: str, extra_examples: str = "") -> dict:
@@ -52,33 +82,21 @@ class GeminiClassifier:
                 ticket_text, provider="gemini", extra_examples=extra_examples
             )
 
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.1,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 100,
-                },
-            )
+            response = self.model.generate_content(prompt)
 
             result_text = response.text.strip()
 
-            # Parse JSON response
-            import json
-            import re
-
             # Extract JSON from markdown code blocks if present
-            json_match = re.search(
-                r"```(?:json)?\s*(\{.*?\})\s*```", result_text, re.DOTALL
-            )
+            json_match = JSON_BLOCK_RE.search(result_text)
             if json_match:
                 result_text = json_match.group(1)
 
-            result = json.loads(result_text)
+            result = _json_loads(result_text)
 
-            logger.info(
-                f"Gemini classification: {result.get('category')} > {result.get('subcategory')}"
+            logger.debug(
+                "Gemini classification: %s > %s",
+                result.get("category"),
+                result.get("subcategory"),
             )
 
             return {
@@ -89,11 +107,11 @@ class GeminiClassifier:
             }
 
         except google_exceptions.ResourceExhausted as e:
-            logger.error(f"⚠️ Gemini rate limit exceeded")
+            logger.error("⚠️ Gemini rate limit exceeded")
             raise RateLimitError("Gemini", retry_after=60)
 
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parse error: {str(e)}, response: {result_text}")
+            logger.error("JSON parse error: %s, response: %s", e, result_text)
             # Fallback: try to extract category from text
             return {
                 "category": "Other",
@@ -102,5 +120,38 @@ class GeminiClassifier:
                 "provider": "gemini",
             }
         except Exception as e:
-            logger.error(f"Classification error: {str(e)}")
+            logger.error("Classification error: %s", e)
             raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((Exception,)),
+    )
+    def classify_batch(self, tickets: list) -> list:
+        """Classify several tickets with one prompt; unparsed entries are None"""
+        try:
+            response = self.model.generate_content(
+                format_batch_classification_prompt(tickets),
+                generation_config={"max_output_tokens": 60 * len(tickets) + 40},
+            )
+        except google_exceptions.ResourceExhausted:
+            logger.error("⚠️ Gemini rate limit exceeded")
+            raise RateLimitError("Gemini", retry_after=60)
+
+        parsed = parse_batch_classification_response(
+            response.text.strip(), len(tickets)
+        )
+        return [
+            (
+                {
+                    "category": item.get("category", "Other"),
+                    "subcategory": item.get("subcategory", "Unclassified"),
+                    "confidence": item.get("confidence", 0.85),
+                    "provider": "gemini",
+                }
+                if item
+                else None
+            )
+            for item in parsed
+        ]
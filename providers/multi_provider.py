@@ -3,11 +3,14 @@ Multi-Provider System for AI Classification
 Supports Gemini as primary and OpenAI as fallback
 """
 
+import json
 import os
 import logging
 import re
+import threading
+import time
+from functools import lru_cache
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -18,14 +21,65 @@ from utils.rule_engine import (
     SUBCATEGORIES,
     CATEGORY_SYNONYMS,
     PRIORITY_MAP,
-    CRITICAL_KEYWORDS,
+    CRITICAL_RE,
     BLACKLIST_KEYWORDS,
     CATEGORY_PRECEDENCE,
-    CATEGORY_PRECEDENCE,
     SUBCATEGORY_PRIORITY_OVERRIDES,
 )
-from utils.prompt_formatter import format_classification_prompt
-from tenacity import retry, stop_after_attempt, wait_exponential
+from utils.prompt_formatter import (
+    format_classification_prompt,
+    format_batch_classification_prompt,
+    parse_batch_classification_response,
+)
+from tenacity import retry, stop_after_attempt, wait_random_exponential
+
+# Upstream connection pool for the OpenAI client, shared by all request threads
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "50"))
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+LOW_PRIORITY_KEYWORDS = [
+    r"cosmetic",
+    r"typo",
+    r"color",
+    r"alignment",
+    r"spacing",
+    r"minor",
+    r"not\s+urgent",
+    r"nice\s+to\s+have",
+    r"suggestion",
+]
+
+# Keyword lists are checked on every result, so scan each as one alternation
+LOW_PRIORITY_RE = re.compile("|".join(f"(?:{p})" for p in LOW_PRIORITY_KEYWORDS))
+BLACKLIST_RE = re.compile("|".join(f"(?:{p})" for p in BLACKLIST_KEYWORDS))
+
+
+@lru_cache(maxsize=1024)
+def _normalize_category_name(category: str) -> str:
+    """Map a provider's category label onto a canonical one (labels repeat a lot)"""
+    cleaned = category.strip()
+    key = cleaned.lower()
+    if key in CATEGORY_SYNONYMS:
+        return CATEGORY_SYNONYMS[key]
+    # Try partial matches
+    for synonym, canonical in CATEGORY_SYNONYMS.items():
+        if synonym in key:
+            return canonical
+    if cleaned in VALID_CATEGORIES:
+        return cleaned
+    return cleaned.title()
+
+
+class AllProvidersFailedError(Exception):
+    """Every provider in the failover chain failed for a ticket"""
 
 
 class CircuitState(Enum):
@@ -43,8 +97,9 @@ class CircuitBreaker:
         self.failure_threshold = failure_threshold
         self.timeout = timeout
         self.failures = 0
-        self.last_failure_time = None
+        self.last_failure_time = None  # time.monotonic()
         self.state = CircuitState.CLOSED
+        self._lock = threading.Lock()
 
     def call(self, func, *args, **kwargs):
         """Execute function with circuit breaker protection"""
@@ -69,19 +124,22 @@ class CircuitBreaker:
 
     def _on_failure(self):
         """Increment failures and open circuit if threshold reached"""
-        self.failures += 1
-        self.last_failure_time = datetime.now()
+        # Request threads fail concurrently; count every failure exactly once
+        with self._lock:
+            self.failures += 1
+            failures = self.failures
+        self.last_failure_time = time.monotonic()
 
-        if self.failures >= self.failure_threshold:
+        if failures >= self.failure_threshold:
             self.state = CircuitState.OPEN
-            logger.warning(f"Circuit breaker opened after {self.failures} failures")
+            logger.warning("Circuit breaker opened after %d failures", failures)
 
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt reset"""
         if self.last_failure_time is None:
             return True
 
-        return (datetime.now() - self.last_failure_time).total_seconds() >= self.timeout
+        return time.monotonic() - self.last_failure_time >= self.timeout
 
 
 class MultiProvider:
@@ -117,9 +175,17 @@ class MultiProvider:
         # Initialize OpenAI (optional fallback)
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.openai_client = None
+        self._openai_client_lock = threading.Lock()
         if self.openai_api_key:
             # We don't check openai library here to allow mocking in tests
             self.openai_available = True
+            # Importing the SDK takes ~0.4s; pay it at startup (in the
+            # preloading master) instead of on the first fallback request
+            try:
+                import httpx  # noqa: F401
+                import openai  # noqa: F401
+            except ImportError:
+                pass
             logger.info("✅ OpenAI provider initialized")
         else:
             logger.warning("⚠️ OPENAI_API_KEY not found")
@@ -138,27 +204,29 @@ class MultiProvider:
                     self.classify_with_gemini, ticket_text, extra_examples
                 )
             except Exception as e:
-                logger.warning(f"Gemini failed: {e}")
+                logger.warning("Gemini failed: %s", e)
 
         # 2. Try OpenAI
         if self.openai_available:
             try:
                 return self.openai_circuit.call(self.classify_with_openai, ticket_text)
             except Exception as e:
-                logger.warning(f"OpenAI failed: {e}")
+                logger.warning("OpenAI failed: %s", e)
 
         # 3. Try Rule Engine as FALLBACK
-        logger.info(
+        logger.debug(
             "⚠️ AI providers failed or unavailable, falling back to Rule Engine"
         )
         rule_match = self.rule_classifier.classify(ticket_text)
         if rule_match:
-            logger.info(f"✅ Rule Engine matched (fallback): {rule_match['category']}")
+            logger.debug(
+                "✅ Rule Engine matched (fallback): %s", rule_match["category"]
+            )
             return self._post_process_result(rule_match, ticket_text)
 
         # If we get here, all providers failed
         if self.allow_providerless:
-            logger.info("Rule-only mode: returning fallback classification")
+            logger.debug("Rule-only mode: returning fallback classification")
             fallback_result = {
                 "category": "Other",
                 "subcategory": "Unclassified",
@@ -166,14 +234,40 @@ class MultiProvider:
                 "provider": "fallback_rule_engine",
             }
             return self._post_process_result(fallback_result, ticket_text)
-        raise Exception("All providers failed")
+        raise AllProvidersFailedError("All providers failed")
+
+    def classify_batch(self, tickets: List[str]) -> List[Optional[Dict]]:
+        """
+        Classify several tickets with one provider call.
+
+        Entries the provider could not answer are None, so callers can fall
+        back to classify() for just those tickets.
+        """
+        if self.gemini_available:
+            try:
+                return self.gemini_circuit.call(
+                    self.gemini_classifier.classify_batch, tickets
+                )
+            except Exception as e:
+                logger.warning("Gemini batch failed: %s", e)
+
+        if self.openai_available:
+            try:
+                return self.openai_circuit.call(
+                    self.classify_batch_with_openai, tickets
+                )
+            except Exception as e:
+                logger.warning("OpenAI batch failed: %s", e)
+
+        return [None] * len(tickets)
 
     def classify_with_gemini(self, ticket_text: str, extra_examples: str = "") -> Dict:
         """Classify using Gemini provider"""
         return self.gemini_classifier.classify(ticket_text, extra_examples)
 
     @retry(
-        stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10)
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=1, min=2, max=10),
     )
     def classify_with_openai(self, ticket_text: str) -> Dict:
         """Classify using OpenAI provider with lazy client initialization"""
@@ -185,9 +279,7 @@ class MultiProvider:
 
         try:
             if self.openai_client is None:
-                import openai
-
-                self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
+                self._init_openai_client()
 
             prompt = format_classification_prompt(ticket_text, provider="openai")
 
@@ -206,9 +298,6 @@ class MultiProvider:
 
             content = response.choices[0].message.content
 
-            # Parse JSON response
-            import json
-
             # Handle potential markdown code blocks
             if "```json" in content:
                 content = content.split("```json")[1].split("```")[0].strip()
@@ -225,9 +314,60 @@ class MultiProvider:
             return result
 
         except Exception as e:
-            logger.error(f"OpenAI classification failed: {e}")
+            logger.error("OpenAI classification failed: %s", e)
             raise
 
+    def classify_batch_with_openai(self, tickets: List[str]) -> List[Optional[Dict]]:
+        """Classify several tickets with one OpenAI JSON-mode completion"""
+        if self.openai_client is None:
+            self._init_openai_client()
+
+        response = self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a support ticket classifier. Return ONLY valid JSON.",
+                },
+                {
+                    "role": "user",
+                    "content": format_batch_classification_prompt(tickets),
+                },
+            ],
+            temperature=0.1,
+            max_tokens=60 * len(tickets) + 40,
+            response_format={"type": "json_object"},
+        )
+        parsed = parse_batch_classification_response(
+            response.choices[0].message.content, len(tickets)
+        )
+        for item in parsed:
+            if item:
+                item.pop("id", None)
+                item.setdefault("provider", "openai")
+                item.setdefault("confidence", 0.8)
+        return parsed
+
+    def _init_openai_client(self):
+        """Create one pooled, keep-alive OpenAI client shared across threads"""
+        with self._openai_client_lock:
+            if self.openai_client is not None:
+                return
+
+            import httpx
+            import openai
+
+            http_client = openai.DefaultHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                ),
+            )
+            self.openai_client = openai.OpenAI(
+                api_key=self.openai_api_key, http_client=http_client
+            )
+
     def _post_process_result(self, result: Dict, ticket_text: str) -> Dict:
         """Normalize category names and apply blacklist corrections"""
         category = result.get("category", "Other")
@@ -280,38 +420,15 @@ class MultiProvider:
     def _normalize_category(self, category: Optional[str]) -> str:
         if not category:
             return "Other"
-        cleaned = category.strip()
-        key = cleaned.lower()
-        if key in CATEGORY_SYNONYMS:
-            return CATEGORY_SYNONYMS[key]
-        # Try partial matches
-        for synonym, canonical in CATEGORY_SYNONYMS.items():
-            if synonym in key:
-                return canonical
-        if cleaned in VALID_CATEGORIES:
-            return cleaned
-        return cleaned.title()
+        return _normalize_category_name(category)
 
     def _is_critical(self, ticket_text: str) -> bool:
         """Check if ticket should be marked as CRITICAL priority"""
-        text = ticket_text.lower()
-        return any(re.search(pattern, text) for pattern in CRITICAL_KEYWORDS)
+        return CRITICAL_RE.search(ticket_text.lower()) is not None
 
     def _is_low_priority(self, ticket_text: str) -> bool:
         """Check if ticket should be marked as LOW priority"""
-        text = ticket_text.lower()
-        low_keywords = [
-            r"cosmetic",
-            r"typo",
-            r"color",
-            r"alignment",
-            r"spacing",
-            r"minor",
-            r"not\s+urgent",
-            r"nice\s+to\s+have",
-            r"suggestion",
-        ]
-        return any(re.search(pattern, text) for pattern in low_keywords)
+        return LOW_PRIORITY_RE.search(ticket_text.lower()) is not None
 
     def _determine_priority(self, category: Optional[str]) -> str:
         """Backward-compatible priority helper used in tests."""
@@ -319,8 +436,7 @@ class MultiProvider:
         return PRIORITY_MAP.get(normalized, "medium")
 
     def _matches_blacklist(self, ticket_text: str) -> bool:
-        text = ticket_text.lower()
-        return any(re.search(pattern, text) for pattern in BLACKLIST_KEYWORDS)
+        return BLACKLIST_RE.search(ticket_text.lower()) is not None
 
     def get_status(self) -> Dict:
         """Get provider availability status"""
@@ -10,14 +10,8 @@ os.environ.setdefault("MASTER_API_KEY", "test_master_key")
 os.environ.setdefault("SECRET_KEY", "test_secret_key")
 os.environ.setdefault("JWT_SECRET", "test_jwt_secret")
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
-import sys
-from pathlib import Path
 from unittest.mock import patch
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 # Load environment variables
 from dotenv import load_dotenv
 
@@ -49,6 +43,45 @@ def app():
     return flask_app
 
 
+@pytest.fixture(autouse=True)
+def skip_provider_retry_backoff(monkeypatch):
+    """Provider retries still run in tests, just without tenacity's 2-10s waits"""
+    # Looked up per test since some tests reload the provider modules
+    import providers.gemini_provider
+    import providers.multi_provider
+
+    for method in (
+        providers.gemini_provider.GeminiClassifier.classify,
+        providers.gemini_provider.GeminiClassifier.classify_batch,
+        providers.multi_provider.MultiProvider.classify_with_openai,
+    ):
+        monkeypatch.setattr(method.retry, "sleep", lambda seconds: None)
+
+
+@pytest.fixture(autouse=True)
+def clear_classification_cache():
+    """Drop cached classifications so per-test classifier mocks take effect"""
+    from app import app as flask_app
+    from extensions import cache
+    import api.v1.classification
+
+    with flask_app.app_context():
+        cache.clear()
+    api.v1.classification._local_cache.clear()
+    api.v1.classification._failed_tickets.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_api_key_cache():
+    """Reset the in-process API key and rate-limit deny caches between tests"""
+    import middleware.auth
+
+    middleware.auth._key_cache.clear()
+    middleware.auth._blocked_until.clear()
+    yield
+
+
 @pytest.fixture
 def client(app):
     """Create test client"""
@@ -28,15 +28,45 @@ def test_api_health(client):
     assert "healthy" in rv.get_json()["status"]
 
 
-def test_html_sanitization_bleach(client):
-    """Test that bleach sanitizes malicious HTML tags from the ticket text"""
+def test_openapi_spec_served_with_cache_headers(client):
+    """Test the OpenAPI spec is served from precomputed bytes"""
+    rv = client.get("/api/v1/openapi.json")
+    assert rv.status_code == 200
+    assert rv.headers["Cache-Control"] == "public, max-age=3600"
+    assert "paths" in rv.get_json()
+
+
+def test_openapi_spec_keeps_cors_headers(client):
+    """Test cross-origin Swagger UIs can still fetch the spec"""
+    rv = client.get(
+        "/api/v1/openapi.json", headers={"Origin": "https://docs.example.com"}
+    )
+    assert rv.status_code == 200
+    assert rv.headers["Access-Control-Allow-Origin"] == "https://docs.example.com"
+
+
+def test_html_sanitization_strips_tags(client):
+    """Test that sanitize_text strips malicious HTML tags from the ticket text"""
     malicious_ticket = "I need help with my router! <script>alert('xss');</script> <b>Please fix it</b>"
 
-    # We test the classify endpoint. We expect 401 unauth without API key,
-    # but the validation and sanitization happens BEFORE the provider error.
     from api.v1.classification import sanitize_text
 
     sanitized = sanitize_text(malicious_ticket)
     assert "<script>" not in sanitized
-    # Bleach strips tags by default in our app.py implementation, but leaves the text content
+    # Tags are stripped but their text content is kept
     assert "Please fix it" in sanitized
+
+
+def test_sanitization_keeps_comparison_operators():
+    """Test that "<" and ">" outside tags are not mistaken for markup"""
+    from api.v1.classification import sanitize_text
+
+    assert sanitize_text("price < 5 and > 3") == "price < 5 and > 3"
+    assert sanitize_text("1 < 2 <!-- note --> <br/>done") == "1 < 2 done"
+
+
+def test_liveness_probe_fast_path(client):
+    """Test /healthz is answered before the Flask request stack"""
+    rv = client.get("/healthz")
+    assert rv.status_code == 200
+    assert rv.get_json() == {"status": "ok"}
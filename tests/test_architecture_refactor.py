@@ -68,3 +68,131 @@ def test_invalid_blueprint_route(client):
     assert response.status_code == 404
     data = response.get_json()
     assert data["error"] == "Not found"
+
+
+def test_request_ids_are_unique_per_process():
+    """Test generated request ids share a process prefix and never repeat"""
+    from app_factory import next_request_id
+
+    first, second = next_request_id(), next_request_id()
+    assert first.startswith("req_") and second.startswith("req_")
+    assert first != second
+    assert first[:12] == second[:12]
+
+
+def test_rate_limit_storage_selection(monkeypatch):
+    """Test Flask-Limiter only uses Redis when counters must be shared"""
+    from app_factory import rate_limit_storage_config
+
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.delenv("RATELIMIT_STORAGE", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    # The stock single-process setup keeps counters in memory
+    assert rate_limit_storage_config() == {"RATELIMIT_STORAGE_URI": "memory://"}
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert rate_limit_storage_config() == {"RATELIMIT_STORAGE_URI": "memory://"}
+
+    monkeypatch.setenv("RATELIMIT_STORAGE", "memory")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert rate_limit_storage_config() == {"RATELIMIT_STORAGE_URI": "memory://"}
+
+    monkeypatch.setenv("RATELIMIT_STORAGE", "auto")
+    config = rate_limit_storage_config()
+    assert config["RATELIMIT_STORAGE_URI"] == "redis://localhost:6379/0"
+    assert "connection_pool" in config["RATELIMIT_STORAGE_OPTIONS"]
+
+
+def _restart_log_listener(monkeypatch, tmp_path, worker_index):
+    """Run the at-fork hook against a listener holding stdout and a log file"""
+    import atexit
+    import logging
+    import logging.handlers
+    import queue
+    import config.logging_config as logging_config
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        tmp_path / "app.log", delay=True
+    )
+    listener = logging.handlers.QueueListener(
+        queue.SimpleQueue(), logging.StreamHandler(), file_handler
+    )
+    monkeypatch.setattr(logging_config, "_listener", listener)
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    if worker_index is None:
+        monkeypatch.delenv("LOG_WORKER_INDEX", raising=False)
+    else:
+        monkeypatch.setenv("LOG_WORKER_INDEX", worker_index)
+    try:
+        logging_config._restart_listener_after_fork()
+    finally:
+        root.removeHandler(queue_handler)
+    restarted = logging_config._listener
+    restarted.stop()
+    atexit.unregister(restarted.stop)
+    return restarted.handlers
+
+
+def test_forked_worker_logs_to_its_slot_file(monkeypatch, tmp_path):
+    """Test a worker with a slot writes app.worker<N>.log and drops the slot"""
+    import logging.handlers
+    import os
+
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "app.log"))
+    handlers = _restart_log_listener(monkeypatch, tmp_path, "3")
+
+    file_handlers = [
+        h for h in handlers if isinstance(h, logging.handlers.RotatingFileHandler)
+    ]
+    assert [h.baseFilename for h in file_handlers] == [
+        str(tmp_path / "app.worker3.log")
+    ]
+    assert "LOG_WORKER_INDEX" not in os.environ
+
+    # Without LOG_FILE the inherited handler's path is the base name
+    monkeypatch.delenv("LOG_FILE")
+    handlers = _restart_log_listener(monkeypatch, tmp_path, "0")
+    assert str(tmp_path / "app.worker0.log") in [
+        getattr(h, "baseFilename", None) for h in handlers
+    ]
+
+
+def test_fork_without_slot_logs_to_stdout_only(monkeypatch, tmp_path):
+    """Test a fork gunicorn gave no slot leaves the log file to its parent"""
+    import logging.handlers
+
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "app.log"))
+    handlers = _restart_log_listener(monkeypatch, tmp_path, None)
+
+    assert len(handlers) == 1
+    assert not isinstance(handlers[0], logging.handlers.RotatingFileHandler)
+
+
+def test_gunicorn_pre_fork_reuses_lowest_free_slot(monkeypatch):
+    """Test respawned workers take the slot their predecessor freed"""
+    import os
+    import runpy
+    from types import SimpleNamespace
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.delenv("LOG_WORKER_INDEX", raising=False)
+    pre_fork = runpy.run_path(
+        os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py")
+    )["pre_fork"]
+    server = SimpleNamespace(WORKERS={})
+
+    for pid in (101, 102, 103):
+        worker = SimpleNamespace()
+        pre_fork(server, worker)
+        server.WORKERS[pid] = worker
+    assert [w.log_index for w in server.WORKERS.values()] == [0, 1, 2]
+    assert os.environ["LOG_WORKER_INDEX"] == "2"
+
+    # Worker in slot 1 dies and is reaped; its replacement reuses the slot
+    del server.WORKERS[102]
+    replacement = SimpleNamespace()
+    pre_fork(server, replacement)
+    assert replacement.log_index == 1
+    assert os.environ["LOG_WORKER_INDEX"] == "1"
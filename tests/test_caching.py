@@ -1,17 +1,8 @@
-import pytest
 from unittest.mock import MagicMock, patch
 from extensions import cache
 from app import app
 
 
-@pytest.fixture
-def client():
-    app.config["TESTING"] = True
-    app.config["CACHE_TYPE"] = "SimpleCache"
-    with app.test_client() as client:
-        yield client
-
-
 def test_caching_behavior():
     """Test that subsequent requests with same ticket are cached"""
     from flask import Flask
@@ -80,3 +71,306 @@ def test_caching_behavior():
         response3 = client.post("/api/v1/classify", json=payload_diff, headers=headers)
         assert response3.status_code == 200
         assert mock_classifier.classify.call_count == 2
+
+
+def test_batch_classify_only_dispatches_cache_misses(client, headers, mocker):
+    """Batch requests resolve cached tickets up front and classify only misses"""
+    mock_classifier = MagicMock()
+    mock_classifier.classify.side_effect = lambda ticket: {
+        "category": "Network Issue",
+        "provider": "mock_provider",
+        "ticket": ticket,
+    }
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    first = client.post(
+        "/api/v1/batch",
+        json={"tickets": ["VPN keeps dropping every hour"]},
+        headers=headers,
+    )
+    assert first.status_code == 200
+    assert mock_classifier.classify.call_count == 1
+
+    second = client.post(
+        "/api/v1/batch",
+        json={
+            "tickets": [
+                "VPN keeps dropping every hour",
+                "Wifi is down in the whole office",
+            ]
+        },
+        headers=headers,
+    )
+    assert second.status_code == 200
+    data = second.get_json()
+    assert data["successful"] == 2
+    assert [r["ticket"] for r in data["results"]] == [
+        "VPN keeps dropping every hour",
+        "Wifi is down in the whole office",
+    ]
+    assert mock_classifier.classify.call_count == 2
+
+
+def test_batch_classify_dedupes_repeated_tickets(client, headers, mocker):
+    """Repeated tickets in one batch reach the provider once"""
+    mock_classifier = MagicMock()
+    mock_classifier.classify.side_effect = lambda ticket: {
+        "category": "Network Issue",
+        "ticket": ticket,
+    }
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    tickets = ["VPN keeps dropping", "vpn keeps dropping ", "VPN keeps dropping"]
+    response = client.post("/api/v1/batch", json={"tickets": tickets}, headers=headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["successful"] == 3
+    assert mock_classifier.classify.call_count == 1
+
+
+def test_classify_cache_hit_rides_rate_limit_round_trip(client, headers, mocker):
+    """Test a cached classification is fetched in the rate-limit pipeline"""
+    mock_classifier = MagicMock()
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    mock_redis = MagicMock()
+    pipe = mock_redis.pipeline.return_value
+    pipe.execute.return_value = [
+        [1, 0, 1, 1, 0],
+        ['{"category": "Network Issue", "priority": "high"}'],
+    ]
+    mocker.patch("middleware.auth.redis_client", mock_redis)
+
+    response = client.post(
+        "/api/v1/classify",
+        json={"ticket": "VPN keeps dropping every hour"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.data == b'{"category": "Network Issue", "priority": "high"}'
+    mock_classifier.classify.assert_not_called()
+    pipe.execute.assert_called_once()
+    mock_redis.mget.assert_not_called()
+
+
+def test_classify_prefetch_keeps_validation_errors(client, headers, mocker):
+    """Test the Redis prefetch hook does not consume the body the view validates"""
+    mock_redis = MagicMock()
+    mock_redis.register_script.return_value.return_value = [1, 0, 1, 1, 0]
+    mocker.patch("middleware.auth.redis_client", mock_redis)
+
+    response = client.post(
+        "/api/v1/classify", json={"ticket": "short"}, headers=headers
+    )
+
+    assert response.status_code == 400
+    assert "Invalid JSON" not in response.get_data(as_text=True)
+    assert "at least 10 characters" in response.get_data(as_text=True)
+
+
+def test_batch_repeat_hits_served_from_process_cache(client, headers, mocker):
+    """Test tickets seen by this worker skip the Redis multi-get next time"""
+    mock_classifier = MagicMock()
+    mock_classifier.classify.return_value = {"category": "Network Issue"}
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    mock_redis = MagicMock()
+    mock_redis.mget.return_value = [None]
+    mocker.patch("middleware.auth.redis_client", mock_redis)
+
+    for _ in range(2):
+        response = client.post(
+            "/api/v1/batch",
+            json={"tickets": ["VPN keeps dropping every hour"]},
+            headers=headers,
+        )
+        assert response.get_json()["results"] == [{"category": "Network Issue"}]
+
+    mock_classifier.classify.assert_called_once()
+    mock_redis.mget.assert_called_once()
+
+
+def test_cache_key_hashes_full_normalized_ticket():
+    """Test tickets sharing a long prefix get distinct keys, case does not matter"""
+    from api.v1.classification import _cache_key
+
+    prefix = "VPN connection drops " * 10
+    assert _cache_key(prefix + "on Monday") != _cache_key(prefix + "on Friday")
+    assert _cache_key("VPN is Down") == _cache_key("  vpn is down ")
+    assert _cache_key("\uff36\uff30\uff2e is Down") == _cache_key("vpn is down")
+
+
+def test_classify_uses_semantic_cache_on_exact_miss(client, headers, mocker):
+    """Test a near-duplicate hit from the semantic cache skips the classifier"""
+    mock_classifier = MagicMock()
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    semantic = MagicMock()
+    semantic.lookup.return_value = {
+        "category": "Hardware Issue",
+        "provider": "semantic_cache",
+    }
+    mocker.patch("api.v1.classification._get_semantic_cache", return_value=semantic)
+
+    response = client.post(
+        "/api/v1/classify",
+        json={"ticket": "My laptop will not turn on at all"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["provider"] == "semantic_cache"
+    mock_classifier.classify.assert_not_called()
+    semantic.store.assert_not_called()
+
+
+def test_batch_classify_packs_misses_into_batch_prompts(client, headers, mocker):
+    """Test batch-capable classifiers get one call per chunk, with per-ticket fallback"""
+
+    class BatchClassifier:
+        def __init__(self):
+            self.batches = []
+            self.singles = []
+
+        def classify_batch(self, tickets):
+            self.batches.append(list(tickets))
+            return [{"category": "Network Issue"}, None, {"category": "Other"}]
+
+        def classify(self, ticket):
+            self.singles.append(ticket)
+            return {"category": "Account Problem"}
+
+    classifier = BatchClassifier()
+    mocker.patch.dict(app.config, {"CLASSIFIER": classifier})
+
+    tickets = ["VPN down again", "Cannot update profile", "Something else"]
+    response = client.post("/api/v1/batch", json={"tickets": tickets}, headers=headers)
+
+    assert response.status_code == 200
+    assert classifier.batches == [tickets]
+    assert classifier.singles == ["Cannot update profile"]
+    assert [r["category"] for r in response.get_json()["results"]] == [
+        "Network Issue",
+        "Account Problem",
+        "Other",
+    ]
+
+
+def test_classify_coalesces_into_batch_prompt_when_enabled(client, headers, mocker):
+    """Test single classify calls ride the batch prompt when a window is set"""
+
+    class BatchClassifier:
+        def __init__(self):
+            self.batches = []
+
+        def classify_batch(self, tickets):
+            self.batches.append(list(tickets))
+            return [{"category": "Network Issue"}]
+
+        def classify(self, ticket):
+            raise AssertionError("answered by the batch prompt")
+
+    classifier = BatchClassifier()
+    mocker.patch.dict(app.config, {"CLASSIFIER": classifier})
+    mocker.patch("api.v1.classification.CLASSIFY_BATCH_WINDOW_MS", 1)
+
+    response = client.post(
+        "/api/v1/classify",
+        json={"ticket": "VPN keeps dropping every hour"},
+        headers=headers,
+    )
+
+    assert response.get_json()["category"] == "Network Issue"
+    assert classifier.batches == [["VPN keeps dropping every hour"]]
+
+
+def test_single_flight_shares_one_call_between_concurrent_misses(monkeypatch):
+    """Test concurrent misses for one key wait on the first caller's result"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    import api.v1.classification
+    from api.v1.classification import _single_flight
+
+    followers_joined = threading.Event()
+    lock = threading.Lock()
+    joined = []
+
+    class TrackingInflight(dict):
+        def get(self, key, default=None):
+            future = super().get(key, default)
+            if future is not None:
+                with lock:
+                    joined.append(key)
+                    if len(joined) == 2:
+                        followers_joined.set()
+            return future
+
+    inflight = TrackingInflight()
+    monkeypatch.setattr(api.v1.classification, "_inflight", inflight)
+    calls = []
+
+    def slow_classify():
+        calls.append(1)
+        # Hold the leader's call open until both followers found its future
+        assert followers_joined.wait(5)
+        return {"category": "Network Issue"}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(_single_flight, "ticket_classification:k", slow_classify)
+            for _ in range(3)
+        ]
+        results = [f.result(timeout=5) for f in futures]
+
+    assert calls == [1]
+    assert results == [{"category": "Network Issue"}] * 3
+    assert "ticket_classification:k" not in inflight
+
+
+def test_classify_failure_is_negatively_cached(client, headers, mocker):
+    """Test a ticket every provider failed on is not retried until the TTL ends"""
+    from providers.multi_provider import AllProvidersFailedError
+
+    mock_classifier = MagicMock()
+    mock_classifier.classify.side_effect = AllProvidersFailedError(
+        "All providers failed"
+    )
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    for _ in range(2):
+        response = client.post(
+            "/api/v1/classify",
+            json={"ticket": "VPN keeps dropping every hour"},
+            headers=headers,
+        )
+        assert response.status_code == 500
+        assert response.get_json()["message"] == "All providers failed"
+
+    mock_classifier.classify.assert_called_once()
+
+
+def test_classify_transient_error_is_not_negatively_cached(client, headers, mocker):
+    """Test errors outside the provider chain do not pin a cached 500"""
+    mock_classifier = MagicMock()
+    mock_classifier.classify.side_effect = [
+        ConnectionError("pool exhausted"),
+        {"category": "Network Issue"},
+    ]
+    mocker.patch.dict(app.config, {"CLASSIFIER": mock_classifier})
+
+    first = client.post(
+        "/api/v1/classify",
+        json={"ticket": "VPN keeps dropping every hour"},
+        headers=headers,
+    )
+    second = client.post(
+        "/api/v1/classify",
+        json={"ticket": "VPN keeps dropping every hour"},
+        headers=headers,
+    )
+
+    assert first.status_code == 500
+    assert second.status_code == 200
+    assert second.get_json()["category"] == "Network Issue"
@@ -143,6 +143,24 @@ class TestOpenAICoverage:
             assert result["category"] == "Billing"
             assert result["confidence"] == 0.9
 
+    def test_openai_client_is_pooled_and_reused(self, mocker):
+        """Test the OpenAI client is built once on a pooled HTTP client"""
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = Mock(
+            choices=[Mock(message=Mock(content='{"category": "Billing"}'))]
+        )
+
+        with patch("openai.OpenAI", return_value=mock_client) as mock_openai:
+            provider = MultiProvider()
+            provider.openai_available = True
+            provider.openai_api_key = "test_key"
+
+            provider.classify_with_openai("first ticket")
+            provider.classify_with_openai("second ticket")
+
+            mock_openai.assert_called_once()
+            assert mock_openai.call_args.kwargs["http_client"] is not None
+
     def test_openai_classify_markdown_json(self, mocker):
         """Test OpenAI classification with markdown code blocks"""
         mocker.patch(
@@ -36,10 +36,11 @@ def test_gemini_classifier_init_with_key(mocker):
     """Test GeminiClassifier initialization with API key"""
     mocker.patch.dict(os.environ, {"GEMINI_API_KEY": "test_key"})
     mocker.patch("providers.gemini_provider.genai.configure")
-    mocker.patch("providers.gemini_provider.genai.GenerativeModel")
+    model_cls = mocker.patch("providers.gemini_provider.genai.GenerativeModel")
 
     classifier = GeminiClassifier()
     assert classifier is not None
+    assert model_cls.call_args.kwargs["generation_config"]["max_output_tokens"] == 100
 
 
 @pytest.mark.skipif(
@@ -161,3 +161,22 @@ def test_real_rate_limiting_info(client, app, mocker, headers, api_key):
     # Check for rate limit headers (if rate limiting is enabled)
     if "X-RateLimit-Limit" in response.headers:
         assert "X-RateLimit-Remaining" in response.headers
+
+
+def test_batch_classify_rejects_out_of_bounds_batches(client, headers):
+    """Batch bounds are enforced without full model validation"""
+    for payload in ({"tickets": []}, {"tickets": ["t"] * 101}, {"tickets": "x"}):
+        response = client.post("/api/v1/batch", json=payload, headers=headers)
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "Validation error"
+
+
+def test_classify_rejects_oversized_and_malformed_bodies(client, headers):
+    """Huge bodies get 413 before decoding; malformed JSON is a validation error"""
+    oversized = '{"ticket": "' + "a" * 1_000_001 + '"}'
+    response = client.post("/api/v1/classify", data=oversized, headers=headers)
+    assert response.status_code == 413
+
+    response = client.post("/api/v1/classify", data="{not json", headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Validation error"
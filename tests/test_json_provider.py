@@ -0,0 +1,34 @@
+"""
+Tests for the orjson-backed JSON provider
+"""
+
+from datetime import datetime, timezone
+
+from flask import Flask, jsonify
+
+from utils.json_provider import OrjsonProvider
+
+
+def test_app_uses_orjson_provider(app):
+    """Test the app factory installs the orjson provider"""
+    assert isinstance(app.json, OrjsonProvider)
+
+
+def test_jsonify_matches_default_provider_output():
+    """Test responses keep the stdlib encoding for common types"""
+    flask_app = Flask(__name__)
+    flask_app.json = OrjsonProvider(flask_app)
+    payload = {
+        "category": "Network Issue",
+        1: "non-string key",
+        "created": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    }
+
+    with flask_app.app_context():
+        response = jsonify(payload)
+
+    assert response.mimetype == "application/json"
+    data = response.get_json()
+    assert data["category"] == "Network Issue"
+    assert data["1"] == "non-string key"
+    assert data["created"] == "Wed, 01 Jan 2025 00:00:00 GMT"
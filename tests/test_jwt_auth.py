@@ -14,18 +14,9 @@ from security.jwt_auth import (
     JWT_ALGORITHM,
 )
 from flask import Flask, request
-from app import app
 import jwt
 
 
-@pytest.fixture
-def client():
-    """Create test client"""
-    app.config["TESTING"] = True
-    with app.test_client() as client:
-        yield client
-
-
 def test_generate_jwt_token():
     """Test JWT token generation"""
     token = generate_jwt_token("user123", "free", "test@example.com")
@@ -213,12 +204,10 @@ def test_require_jwt_or_api_key_expired_jwt_direct():
         assert response.status_code == 401
 
 
-def test_jwt_token_different_tiers():
+@pytest.mark.parametrize("tier", ["free", "starter", "professional", "enterprise"])
+def test_jwt_token_different_tiers(tier):
     """Test JWT tokens for different tiers"""
-    tiers = ["free", "starter", "professional", "enterprise"]
-
-    for tier in tiers:
-        token = generate_jwt_token("user123", tier)
-        payload = validate_jwt_token(token)
-        assert payload is not None
-        assert payload["tier"] == tier
+    token = generate_jwt_token("user123", tier)
+    payload = validate_jwt_token(token)
+    assert payload is not None
+    assert payload["tier"] == tier
@@ -138,6 +138,116 @@ def test_api_key_manager_get_key_data_not_found(mock_redis_client):
     assert key_data is None
 
 
+def test_api_key_manager_get_key_data_cached_in_process(mocker):
+    """Test repeated lookups for the same key are served from memory"""
+    import unittest.mock
+
+    # Stop the conftest patches to reach the real get_key_data
+    unittest.mock.patch.stopall()
+    mock_redis_client = Mock()
+    mocker.patch("middleware.auth.redis_client", mock_redis_client)
+    mock_redis_client.hgetall.return_value = {
+        "id": "key_id",
+        "user_id": "123",
+        "tier": "free",
+        "is_active": "true",
+    }
+
+    first = APIKeyManager.get_key_data("atc_cached_key")
+    second = APIKeyManager.get_key_data("atc_cached_key")
+
+    assert first == second
+    assert first["user_id"] == "123"
+    assert mock_redis_client.hgetall.call_count == 1
+
+
+def test_api_key_revocation_evicts_other_workers_caches(
+    mocker, mock_redis_client, mock_db_session
+):
+    """Test a revoke in one worker is broadcast to every worker's key cache"""
+    import middleware.auth
+
+    mocker.patch("middleware.auth._invalidation_listener_pid", None)
+    assert middleware.auth._ensure_invalidation_listener() is True
+    subscribe = mock_redis_client.pubsub.return_value.subscribe
+    on_revoked = subscribe.call_args.kwargs[middleware.auth.API_KEY_REVOKED_CHANNEL]
+
+    key_hash = APIKeyManager.hash_key("atc_revoked_elsewhere")
+    mock_key = Mock()
+    mock_key.key_hash = key_hash
+    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_key
+    assert APIKeyManager.revoke_key("1", "123") is True
+    mock_redis_client.publish.assert_called_once_with(
+        middleware.auth.API_KEY_REVOKED_CHANNEL, key_hash
+    )
+
+    # Another worker still holds the key; the broadcast message evicts it
+    other_worker_cache = middleware.auth.TTLCache(maxsize=10, ttl=60)
+    other_worker_cache.set(key_hash, {"id": "1", "is_active": True})
+    mocker.patch("middleware.auth._key_cache", other_worker_cache)
+    on_revoked({"channel": middleware.auth.API_KEY_REVOKED_CHANNEL, "data": key_hash})
+    assert other_worker_cache.get(key_hash) is None
+
+
+def test_dead_invalidation_listener_stops_key_caching(mocker):
+    """Test keys are no longer cached once the revocation listener has died"""
+    import redis
+    import unittest.mock
+    import middleware.auth
+
+    # Stop the conftest patches to reach the real get_key_data
+    unittest.mock.patch.stopall()
+    mock_redis_client = Mock()
+    mocker.patch("middleware.auth.redis_client", mock_redis_client)
+    mocker.patch("middleware.auth._invalidation_listener_pid", None)
+    mocker.patch("middleware.auth._invalidation_listener", None)
+    mocker.patch("middleware.auth._invalidation_retry_at", 0.0)
+    mock_redis_client.hgetall.return_value = {
+        "id": "key_id",
+        "user_id": "123",
+        "tier": "free",
+        "is_active": "true",
+    }
+    listener = mock_redis_client.pubsub.return_value.run_in_thread.return_value
+    listener.is_alive.return_value = True
+
+    APIKeyManager.get_key_data("atc_listener_key")
+    APIKeyManager.get_key_data("atc_listener_key")
+    assert mock_redis_client.hgetall.call_count == 1
+
+    # A pub/sub connection error drops everything cached and stops the thread
+    on_error = mock_redis_client.pubsub.return_value.run_in_thread.call_args.kwargs[
+        "exception_handler"
+    ]
+    on_error(
+        redis.ConnectionError("gone"), mock_redis_client.pubsub.return_value, listener
+    )
+    listener.stop.assert_called_once()
+    assert len(middleware.auth._key_cache) == 0
+
+    # Resubscribing fails too, so lookups go to Redis every time
+    listener.is_alive.return_value = False
+    mock_redis_client.pubsub.side_effect = redis.ConnectionError("still down")
+    APIKeyManager.get_key_data("atc_listener_key")
+    APIKeyManager.get_key_data("atc_listener_key")
+    assert mock_redis_client.hgetall.call_count == 3
+    assert len(middleware.auth._key_cache) == 0
+
+
+def test_api_key_manager_revoke_key_evicts_cache(mock_redis_client, mock_db_session):
+    """Test revoking a key drops its cached data"""
+    import middleware.auth
+
+    key_hash = APIKeyManager.hash_key("atc_revoked_key")
+    middleware.auth._key_cache.set(key_hash, {"id": "1", "is_active": True})
+    mock_key = Mock()
+    mock_key.key_hash = key_hash
+    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_key
+
+    assert APIKeyManager.revoke_key("1", "123") is True
+    assert middleware.auth._key_cache.get(key_hash) is None
+
+
 def test_api_key_manager_revoke_key(mock_redis_client, mock_db_session):
     """Test revoking an API key"""
     mock_redis_client.smembers.return_value = {"key_hash_1", "key_hash_2"}
@@ -122,14 +122,17 @@ class TestMiddlewareAuthCoverage:
         unittest.mock.patch.stopall()
 
         mock_redis = MagicMock()
-        mock_redis.incr.return_value = 101  # Exceeds free tier limit of 100
-        mock_redis.expire.return_value = True
-        mock_redis.ttl.return_value = 3600
+        # Script result: denied by the hourly window, resets in 30 minutes
+        mock_redis.register_script.return_value.return_value = [0, 1, 0, 0, 1800000]
 
         with patch("middleware.auth.redis_client", mock_redis):
             allowed, info = middleware.auth.RateLimiter.check_rate_limit("1", "free")
             assert allowed is False
-            assert "limit" in info or "remaining" in info or "hourly_limit" in info
+            assert (
+                info["limit"]
+                == middleware.auth.TIER_LIMITS["free"]["requests_per_hour"]
+            )
+            assert info["reset_in"] == 1800
 
     def test_rate_limiter_check_rate_limit_daily_exceeded(self, mocker):
         """Test RateLimiter.check_rate_limit when daily limit exceeded"""
@@ -139,42 +142,114 @@ class TestMiddlewareAuthCoverage:
         unittest.mock.patch.stopall()
 
         mock_redis = MagicMock()
-        call_count = [0]
-
-        def incr_side_effect(key):
-            call_count[0] += 1
-            if "hour" in key:
-                return 50  # Hourly OK
-            elif "day" in key:
-                return 1001  # Daily exceeded
-            return 1
-
-        mock_redis.incr.side_effect = incr_side_effect
-        mock_redis.ttl.return_value = 86400
+        # Script result: hourly window OK, denied by the daily window
+        mock_redis.register_script.return_value.return_value = [
+            0,
+            2,
+            30,
+            0,
+            86400000,
+        ]
 
         with patch("middleware.auth.redis_client", mock_redis):
             allowed, info = middleware.auth.RateLimiter.check_rate_limit("1", "free")
             assert allowed is False
-            assert "limit" in info
+            assert (
+                info["limit"] == middleware.auth.TIER_LIMITS["free"]["requests_per_day"]
+            )
+            assert info["reset_in"] == 86400
 
     def test_rate_limiter_check_rate_limit_first_request(self, mocker):
-        """Test RateLimiter.check_rate_limit on first request (sets expire)"""
+        """Test RateLimiter.check_rate_limit runs one atomic script call"""
         # Stop all active patches to access real function
         import unittest.mock
 
         unittest.mock.patch.stopall()
 
         mock_redis = MagicMock()
-        mock_redis.incr.return_value = 1  # First request
-        mock_redis.expire.return_value = True
-        mock_redis.ttl.return_value = 3600
-        mock_redis.get.return_value = 1
+        script = mock_redis.register_script.return_value
+        script.return_value = [1, 0, 49, 999, 0]
 
         with patch("middleware.auth.redis_client", mock_redis):
             allowed, info = middleware.auth.RateLimiter.check_rate_limit("1", "free")
             assert allowed is True
-            # expire should be called for both hour and day keys
-            assert mock_redis.expire.call_count >= 1
+            assert info["hourly_remaining"] == 49
+            assert info["daily_remaining"] == 999
+            # Both windows are handled by a single script round trip
+            script.assert_called_once()
+            assert script.call_args.kwargs["keys"] == [
+                "rate_limit:gcra:{1}:hour",
+                "rate_limit:gcra:{1}:day",
+            ]
+            mock_redis.incr.assert_not_called()
+
+    def test_rate_limit_prefetch_is_one_round_trip(self, monkeypatch):
+        """Test the rate limit script and prefetch MGET share one round trip"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        import unittest.mock
+
+        unittest.mock.patch.stopall()
+
+        client = fakeredis.FakeRedis(decode_responses=True)
+        client.set("cached", "value")
+        sent = []
+        connection_class = client.connection_pool.connection_class
+        send = connection_class.send_packed_command
+
+        def counting_send(self, command, check_health=True):
+            sent.append(command)
+            return send(self, command, check_health)
+
+        monkeypatch.setattr(connection_class, "send_packed_command", counting_send)
+        monkeypatch.setattr(middleware.auth, "redis_client", client)
+        monkeypatch.setattr(
+            middleware.auth,
+            "_rate_limit_sha",
+            client.script_load(middleware.auth.RATE_LIMIT_LUA),
+        )
+
+        sent.clear()
+        allowed, _, values = middleware.auth.RateLimiter.check_rate_limit_and_get(
+            "1", "free", ["cached"]
+        )
+        assert allowed is True
+        assert values == ["value"]
+        assert len(sent) == 1
+
+        # A flushed script cache costs one reload and a single retry
+        client.script_flush()
+        sent.clear()
+        allowed, _, values = middleware.auth.RateLimiter.check_rate_limit_and_get(
+            "1", "free", ["cached"]
+        )
+        assert allowed is True
+        assert values == ["value"]
+        assert len(sent) == 3
+
+    def test_rate_limiter_denials_served_from_local_cache(self, mocker):
+        """Test a client known to be over limit is denied without Redis"""
+        import unittest.mock
+
+        unittest.mock.patch.stopall()
+
+        mock_redis = MagicMock()
+        script = mock_redis.register_script.return_value
+        script.return_value = [0, 1, 0, 0, 60000]
+
+        with patch("middleware.auth.redis_client", mock_redis):
+            first, _ = middleware.auth.RateLimiter.check_rate_limit("1", "free")
+            second, info = middleware.auth.RateLimiter.check_rate_limit("1", "free")
+
+            assert first is False and second is False
+            assert info["reset_in"] == 60
+            script.assert_called_once()
+
+            middleware.auth.RateLimiter.reset("1")
+            mock_redis.publish.assert_called_once_with("rate_limit:reset", "1")
+            script.return_value = [1, 0, 49, 999, 0]
+            allowed, _ = middleware.auth.RateLimiter.check_rate_limit("1", "free")
+            assert allowed is True
 
     def test_require_api_key_no_key(self, client):
         """Test require_api_key decorator without API key"""
@@ -56,12 +56,12 @@ class TestMultiProviderCoverage:
     def test_circuit_breaker_open_state_raises(self):
         """Test circuit breaker in OPEN state raises exception"""
         from providers.multi_provider import CircuitBreaker, CircuitState
-        from datetime import datetime, timedelta
+        import time
 
         cb = CircuitBreaker(failure_threshold=1, timeout=100)
         cb.state = CircuitState.OPEN
         # Set last_failure_time to recent past so _should_attempt_reset returns False
-        cb.last_failure_time = datetime.now() - timedelta(seconds=10)
+        cb.last_failure_time = time.monotonic() - 10
 
         def func():
             return "success"
@@ -72,11 +72,11 @@ class TestMultiProviderCoverage:
     def test_circuit_breaker_half_open_reset(self):
         """Test circuit breaker resets to HALF_OPEN after timeout"""
         from providers.multi_provider import CircuitBreaker, CircuitState
-        from datetime import datetime, timedelta
+        import time
 
         cb = CircuitBreaker(failure_threshold=1, timeout=1)
         cb.state = CircuitState.OPEN
-        cb.last_failure_time = datetime.now() - timedelta(seconds=2)  # Past timeout
+        cb.last_failure_time = time.monotonic() - 2  # Past timeout
 
         def func():
             return "success"
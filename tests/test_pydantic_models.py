@@ -70,3 +70,10 @@ def test_batch_ticket_request_sanitize():
     sanitized = [sanitize_text(t) for t in tickets if sanitize_text(t)]
     assert len(sanitized) >= 1
     assert "\x00" not in sanitized[0]
+
+
+def test_sanitize_text_does_not_html_escape():
+    """Test sanitization strips tags but leaves plain text unescaped"""
+    from api.v1.classification import sanitize_text
+
+    assert sanitize_text("Price < 5 & <b>rising</b>") == "Price < 5 & rising"
@@ -45,3 +45,11 @@ def test_classify_no_match(rule_engine):
     text = "Just saying hello"
     result = rule_engine.classify(text)
     assert result is None
+
+
+def test_classify_prefers_higher_precedence_category(rule_engine):
+    """Test that overlapping matches resolve by category precedence"""
+    text = "There was a security breach and my invoice says I was charged twice"
+    result = rule_engine.classify(text)
+    assert result["category"] == "Security Incident"
+    assert result["matched_pattern"] == "breach"
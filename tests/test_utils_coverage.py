@@ -43,3 +43,45 @@ def test_circuit_breaker_open():
     # Should be open now
     with pytest.raises(RuntimeError, match="Circuit breaker is open"):
         decorated()
+
+
+def test_api_error_timestamp_is_cached_per_second(mocker):
+    """Test error timestamps are formatted once per wall-clock second"""
+    mocker.patch("utils.clock.time.time", return_value=1_700_000_000.4)
+    first = APIError("boom", 400).to_dict()["timestamp"]
+    mocker.patch("utils.clock.time.time", return_value=1_700_000_000.9)
+    assert APIError("boom", 400).to_dict()["timestamp"] is first
+    assert first == "2023-11-14T22:13:20+00:00"
+
+
+def test_micro_batcher_coalesces_concurrent_items():
+    """Test items submitted within one window reach batch_fn together"""
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.micro_batcher import MicroBatcher
+
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item.upper() for item in items[:-1]]  # last entry unanswered
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batcher = MicroBatcher(batch_fn, executor, max_batch=8, window=0.2)
+        futures = [batcher.submit(t) for t in ("a", "b", "c")]
+        results = [f.result(timeout=5) for f in futures]
+
+    assert calls == [["a", "b", "c"]]
+    assert results == ["A", "B", None]
+
+
+def test_micro_batcher_failed_batch_resolves_to_none():
+    """Test a raising batch_fn leaves callers to fall back individually"""
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.micro_batcher import MicroBatcher
+
+    def batch_fn(items):
+        raise RuntimeError("provider down")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        batcher = MicroBatcher(batch_fn, executor, window=0.01)
+        assert batcher.submit("a").result(timeout=5) is None
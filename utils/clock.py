@@ -0,0 +1,20 @@
+"""
+Cheap wall-clock timestamps for response payloads
+"""
+
+import time
+from datetime import datetime, timezone
+
+_last_iso = (0, "")
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 at second resolution, formatted once per second"""
+    global _last_iso
+    now = int(time.time())
+    second, iso = _last_iso
+    if now != second:
+        iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        # A single tuple assignment keeps readers on other threads consistent
+        _last_iso = (now, iso)
+    return iso
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from utils.clock import utc_now_iso
 
 
 class APIError(Exception):
@@ -14,5 +14,5 @@ class APIError(Exception):
         rv = dict(self.payload or ())
         rv["message"] = self.message
         rv["code"] = self.status_code
-        rv["timestamp"] = datetime.now(timezone.utc).isoformat()
+        rv["timestamp"] = utc_now_iso()
         return rv
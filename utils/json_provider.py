@@ -0,0 +1,38 @@
+"""
+Flask JSON provider backed by orjson, falling back to the stdlib when missing
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize responses with orjson and hand the bytes straight to Flask"""
+
+    def _options(self) -> int:
+        # Datetimes go through Flask's default hook to keep the HTTP date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,82 @@
+"""
+Coalesce concurrent single-item calls into batched calls
+
+Requests arriving within a short window are handed to ``batch_fn`` together;
+each caller gets back its own entry of the batch result.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collect items for up to ``window`` seconds, then run them as one batch"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Optional[Any]]],
+        executor: Executor,
+        max_batch: int = 16,
+        window: float = 0.005,
+    ):
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(self, item: Any) -> Future:
+        """Queue ``item``; the future resolves to its batch entry or None"""
+        self._ensure_drainer()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_drainer(self) -> None:
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                threading.Thread(
+                    target=self._drain, name="micro-batcher", daemon=True
+                ).start()
+                self._pid = os.getpid()
+
+    def _drain(self) -> None:
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Run the batch elsewhere so the next window opens immediately
+            self.executor.submit(self._run, batch)
+
+    def _run(self, batch: List[tuple]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self.batch_fn(items)
+        except Exception as e:
+            logger.warning("Micro-batch of %d failed: %s", len(items), e)
+            results = [None] * len(items)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        for _, future in batch[len(results) :]:
+            future.set_result(None)
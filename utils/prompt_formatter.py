@@ -1,13 +1,8 @@
-from typing import Optional
+import json
+import re
+from typing import Dict, List, Optional
 
-
-def format_classification_prompt(
-    ticket_text: str, provider: str = None, extra_examples: str = ""
-) -> str:
-    """
-    Format the classification prompt for AI providers.
-    """
-    return f"""You are an expert support ticket classifier. Classify the ticket into ONE category and ONE subcategory.
+CLASSIFICATION_GUIDE = """You are an expert support ticket classifier. Classify the ticket into ONE category and ONE subcategory.
 
 **STRICT RULES:**
 1. Choose EXACTLY ONE category from the list below
@@ -118,7 +113,16 @@ Subcategory: Firmware
 Example 15:
 Ticket: "Someone accessed my account without permission"
 Category: Security Incident
-Subcategory: Unauthorized Access
+Subcategory: Unauthorized Access"""
+
+
+def format_classification_prompt(
+    ticket_text: str, provider: str = None, extra_examples: str = ""
+) -> str:
+    """
+    Format the classification prompt for AI providers.
+    """
+    return f"""{CLASSIFICATION_GUIDE}
 
 {extra_examples}
 
@@ -133,3 +137,54 @@ Ticket: "{ticket_text}"
 }}
 
 Return ONLY valid JSON, nothing else."""
+
+
+def format_batch_classification_prompt(tickets: List[str]) -> str:
+    """
+    Format one prompt that classifies several numbered tickets at once.
+    """
+    numbered = "\n".join(
+        f"{i}. {json.dumps(ticket, ensure_ascii=False)}"
+        for i, ticket in enumerate(tickets, 1)
+    )
+    return f"""{CLASSIFICATION_GUIDE}
+
+**NOW CLASSIFY EACH OF THESE {len(tickets)} NUMBERED TICKETS INDEPENDENTLY:**
+{numbered}
+
+**RESPONSE FORMAT (JSON):**
+{{
+  "results": [
+    {{"id": 1, "category": "Category Name", "subcategory": "Subcategory Name", "confidence": 0.95}}
+  ]
+}}
+
+Return ONLY valid JSON with exactly one entry per ticket id, nothing else."""
+
+
+BATCH_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
+
+def parse_batch_classification_response(text: str, count: int) -> List[Optional[Dict]]:
+    """
+    Map a batch response back onto ticket positions; missing ids stay None.
+    """
+    results: List[Optional[Dict]] = [None] * count
+    match = BATCH_JSON_BLOCK_RE.search(text)
+    try:
+        items = json.loads(match.group(1) if match else text).get("results", [])
+    except (ValueError, AttributeError):
+        # A malformed reply leaves every ticket to the per-ticket fallback
+        return results
+    if not isinstance(items, list):
+        return results
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item["id"]) - 1
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < count and item.get("category"):
+            results[index] = item
+    return results
@@ -4,25 +4,28 @@ from __future__ import annotations
 
 import logging
 import random
+import threading
 import time
 from collections import deque
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
 from functools import wraps
 from typing import Callable, Deque, Iterable, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class CircuitBreakerState:
     """Internal state holder for the circuit breaker."""
 
     failure_threshold: int
     recovery_timeout: int
     consecutive_failures: int = 0
-    last_failure_time: datetime | None = None
+    last_failure_time: float | None = None  # time.monotonic()
     is_open: bool = False
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
 
     def record_success(self) -> None:
         self.consecutive_failures = 0
@@ -30,9 +33,12 @@ class CircuitBreakerState:
         self.last_failure_time = None
 
     def record_failure(self) -> None:
-        self.consecutive_failures += 1
-        self.last_failure_time = datetime.utcnow()
-        if self.consecutive_failures >= self.failure_threshold:
+        # Concurrent failures must each count toward the threshold
+        with self._lock:
+            self.consecutive_failures += 1
+            failures = self.consecutive_failures
+        self.last_failure_time = time.monotonic()
+        if failures >= self.failure_threshold:
             self.is_open = True
 
     def can_attempt(self) -> bool:
@@ -40,8 +46,7 @@ class CircuitBreakerState:
             return True
         if not self.last_failure_time:
             return True
-        elapsed = datetime.utcnow() - self.last_failure_time
-        return elapsed >= timedelta(seconds=self.recovery_timeout)
+        return time.monotonic() - self.last_failure_time >= self.recovery_timeout
 
 
 def retry(
@@ -95,7 +100,7 @@ def circuit_breaker(
             failure_threshold=failure_threshold,
             recovery_timeout=recovery_timeout,
         )
-        failure_window: Deque[datetime] = deque(maxlen=failure_threshold)
+        failure_window: Deque[float] = deque(maxlen=failure_threshold)
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -108,7 +113,7 @@ def circuit_breaker(
                 failure_window.clear()
                 return result
             except Exception as exc:  # noqa: BLE001
-                failure_window.append(datetime.utcnow())
+                failure_window.append(time.monotonic())
                 state.record_failure()
                 logger.warning(
                     "Circuit breaker failure",
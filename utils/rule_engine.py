@@ -177,6 +177,8 @@ CRITICAL_KEYWORDS = [
     r"security breach",
 ]
 
+CRITICAL_RE = re.compile("|".join(f"(?:{p})" for p in CRITICAL_KEYWORDS))
+
 BLACKLIST_KEYWORDS = [
     r"free money",
     r"visit .*bitcoin",
@@ -758,65 +760,66 @@ class RuleEngine:
 
     def __init__(self):
         self.rules = _compile_category_rules()
+        # One alternation per rule answers "does anything match" in a single
+        # scan; the individual patterns are only needed for matched_pattern.
+        for rule in self.rules:
+            rule["compiled"] = [re.compile(p) for p in rule["patterns"]]
+            rule["regex"] = re.compile("|".join(f"(?:{p})" for p in rule["patterns"]))
+
+        # Resolution order, fixed at construction:
+        # 0. An explicit Mixed Issue rule overrides everything
+        # 1. Category Precedence (lower index = higher priority)
+        # 2. Rule Index (lower index = more specific rule, assuming rules are ordered)
+        def sort_key(indexed_rule):
+            index, rule = indexed_rule
+            try:
+                cat_priority = CATEGORY_PRECEDENCE.index(rule["category"])
+            except ValueError:
+                cat_priority = float("inf")
+            return (rule["category"] != "Mixed Issue", cat_priority, index)
+
+        self._ordered_rules = [
+            rule for _, rule in sorted(enumerate(self.rules), key=sort_key)
+        ]
 
     def classify(self, ticket_text: str) -> Optional[Dict]:
         text = ticket_text.lower()
-        matches = []
 
-        # Debug logging
-        logger.info(f"🔍 Rule Engine processing: '{text[:50]}...'")
+        logger.debug("🔍 Rule Engine processing: '%.50s...'", text)
 
-        # Find all matching categories
-        for i, rule in enumerate(self.rules):
-            if any(re.search(pattern, text) for pattern in rule["patterns"]):
-                matches.append(
-                    {
-                        "index": i,
-                        "category": rule["category"],
-                        "subcategory": rule.get("subcategory"),
-                    }
-                )
-                logger.info(
-                    f"✅ Match found: {rule['category']} -> {rule.get('subcategory')}"
-                )
+        # Rules are pre-sorted by resolution order, so the first hit wins
+        best_match = None
+        for rule in self._ordered_rules:
+            if rule["regex"].search(text):
+                best_match = rule
+                break
 
-        if not matches:
-            logger.info("❌ No rules matched")
+        if best_match is None:
+            logger.debug("❌ No rules matched")
             return None
 
+        logger.debug(
+            "✅ Match found: %s -> %s",
+            best_match["category"],
+            best_match.get("subcategory"),
+        )
+
         # Special case: If Mixed Issue explicit pattern matches, it takes precedence
-        mixed_match = next((m for m in matches if m["category"] == "Mixed Issue"), None)
-        if mixed_match:
-            logger.info(f"🔀 Mixed Issue detected, overriding other matches")
+        if best_match["category"] == "Mixed Issue":
+            logger.debug("🔀 Mixed Issue detected, overriding other matches")
             return {
                 "category": "Mixed Issue",
-                "subcategory": mixed_match["subcategory"] or "Multiple Issues",
+                "subcategory": best_match.get("subcategory") or "Multiple Issues",
                 "confidence": 0.80,
                 "priority": "critical",  # Multiple issues = critical
                 "provider": "rule_engine",
             }
 
-        # Select the best category based on precedence
-        # Sort by:
-        # 1. Category Precedence (lower index = higher priority)
-        # 2. Rule Index (lower index = more specific rule, assuming rules are ordered)
-
-        def sort_key(match):
-            try:
-                cat_priority = CATEGORY_PRECEDENCE.index(match["category"])
-            except ValueError:
-                cat_priority = float("inf")
-            return (cat_priority, match["index"])
-
-        matches.sort(key=sort_key)
-        best_match = matches[0]
-
         # Find the specific pattern that matched
         matched_pattern = None
-        rule = self.rules[best_match["index"]]
-        for pattern in rule["patterns"]:
-            if re.search(pattern, text):
-                matched_pattern = pattern
+        for pattern in best_match["compiled"]:
+            if pattern.search(text):
+                matched_pattern = pattern.pattern
                 break
 
         # Determine priority
@@ -825,19 +828,19 @@ class RuleEngine:
         # Check for subcategory overrides
         if (
             best_match["category"],
-            best_match["subcategory"],
+            best_match.get("subcategory"),
         ) in SUBCATEGORY_PRIORITY_OVERRIDES:
             priority = SUBCATEGORY_PRIORITY_OVERRIDES[
-                (best_match["category"], best_match["subcategory"])
+                (best_match["category"], best_match.get("subcategory"))
             ]
 
         # Check for CRITICAL keywords
-        if any(re.search(pattern, text) for pattern in CRITICAL_KEYWORDS):
+        if CRITICAL_RE.search(text):
             priority = "critical"
 
         return {
             "category": best_match["category"],
-            "subcategory": best_match["subcategory"],
+            "subcategory": best_match.get("subcategory"),
             "confidence": 0.80,  # Lowered to allow more Gemini usage
             "priority": priority,
             "provider": "rule_engine",
@@ -0,0 +1,98 @@
+"""
+Embedding-similarity cache for near-duplicate tickets
+
+Backed by a RediSearch HNSW vector index. Needs Redis Stack and the optional
+sentence-transformers package; when either is missing the cache stays disabled.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MODEL = os.getenv(
+    "SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+)
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+
+INDEX_NAME = "idx:ticket_semantic"
+KEY_PREFIX = "semantic:ticket:"
+
+
+class SemanticCache:
+    """Nearest-neighbour lookup of past classifications by ticket embedding"""
+
+    def __init__(self, redis_client, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.redis = redis_client
+        self.threshold = threshold
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _embed(self, ticket: str) -> bytes:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(SEMANTIC_CACHE_MODEL)
+                    self._ensure_index(self._model.get_sentence_embedding_dimension())
+        vector = self._model.encode(ticket, normalize_embeddings=True)
+        return vector.astype("float32").tobytes()
+
+    def _ensure_index(self, dim: int) -> None:
+        from redis.commands.search.field import TextField, VectorField
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+        try:
+            self.redis.ft(INDEX_NAME).info()
+        except Exception:
+            self.redis.ft(INDEX_NAME).create_index(
+                [
+                    TextField("result", no_index=True),
+                    VectorField(
+                        "vec",
+                        "HNSW",
+                        {"TYPE": "FLOAT32", "DIM": dim, "DISTANCE_METRIC": "COSINE"},
+                    ),
+                ],
+                definition=IndexDefinition(
+                    prefix=[KEY_PREFIX], index_type=IndexType.HASH
+                ),
+            )
+
+    def lookup(self, ticket: str) -> Optional[Dict]:
+        """Return the closest cached classification above the similarity threshold"""
+        from redis.commands.search.query import Query
+
+        query = (
+            Query("*=>[KNN 1 @vec $v AS score]")
+            .return_fields("result", "score")
+            .sort_by("score")
+            .dialect(2)
+        )
+        docs = (
+            self.redis.ft(INDEX_NAME)
+            .search(query, query_params={"v": self._embed(ticket)})
+            .docs
+        )
+        # COSINE score is a distance: 0 means identical
+        if not docs or 1 - float(docs[0].score) < self.threshold:
+            return None
+        result = json.loads(docs[0].result)
+        result["provider"] = "semantic_cache"
+        return result
+
+    def store(self, ticket: str, result: Dict) -> None:
+        key = KEY_PREFIX + hashlib.blake2b(ticket.encode(), digest_size=16).hexdigest()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(
+            key, mapping={"vec": self._embed(ticket), "result": json.dumps(result)}
+        )
+        pipe.expire(key, SEMANTIC_CACHE_TTL)
+        pipe.execute()